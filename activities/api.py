@@ -0,0 +1,143 @@
+"""
+API JSON somente leitura das atividades.
+
+    GET /api/atividades/?search=&type=&status=&start_date=&end_date=
+        &fields=id,title,tags&limit=20&cursor=<token>
+    GET /api/atividades/?format=ndjson   (exportação completa em streaming)
+    GET /api/atividades/<pk>/
+"""
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+
+from .exports import streaming_content
+from .filters import filter_activities, parse_filter_date
+from .models import Activity, ActivityRequirement, ActivityTag
+from .pagination import InvalidCursor, KeysetPaginator
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+STREAM_CHUNK_SIZE = 500
+
+MODEL_FIELDS = (
+    'id', 'title', 'description', 'type', 'status', 'start_date', 'end_date', 'time',
+    'location', 'coordinator', 'participants', 'image_url', 'created_at', 'updated_at',
+)
+EXTRA_FIELDS = ('url', 'tags', 'requirements')
+ALL_FIELDS = MODEL_FIELDS + EXTRA_FIELDS
+
+
+class InvalidFields(ValueError):
+    pass
+
+
+def parse_fields(value):
+    """Lê o parâmetro fields= ("id,title,tags"); sem ele, devolve todos os campos"""
+    if not value:
+        return ALL_FIELDS
+    fields = tuple(dict.fromkeys(field.strip() for field in value.split(',') if field.strip()))
+    unknown = [field for field in fields if field not in ALL_FIELDS]
+    if unknown:
+        raise InvalidFields(f'Campos desconhecidos: {", ".join(unknown)}')
+    return fields
+
+
+def api_queryset(fields):
+    """Carrega só as colunas e relações pedidas em ``fields``"""
+    # created_at e id são sempre necessários para montar o cursor
+    columns = {'id', 'created_at'} | {field for field in fields if field in MODEL_FIELDS}
+    queryset = Activity.objects.only(*columns)
+    if 'tags' in fields:
+        queryset = queryset.prefetch_related(Prefetch('tags', queryset=ActivityTag.objects.only('name')))
+    if 'requirements' in fields:
+        queryset = queryset.prefetch_related(
+            Prefetch('requirements', queryset=ActivityRequirement.objects.only('activity_id', 'requirement'))
+        )
+    return queryset
+
+
+def serialize_activity(activity, fields):
+    data = {}
+    for field in fields:
+        if field == 'url':
+            data['url'] = activity.get_absolute_url()
+        elif field == 'tags':
+            data['tags'] = [tag.name for tag in activity.tags.all()]
+        elif field == 'requirements':
+            data['requirements'] = [r.requirement for r in activity.requirements.all()]
+        else:
+            data[field] = getattr(activity, field)
+    return data
+
+
+def error_response(message, status=400):
+    return JsonResponse({'error': message}, status=status)
+
+
+@require_GET
+def api_activity_list(request):
+    try:
+        fields = parse_fields(request.GET.get('fields'))
+    except InvalidFields as exc:
+        return error_response(str(exc))
+
+    # As páginas ignoram datas inválidas; a API avisa o cliente
+    for name in ('start_date', 'end_date'):
+        if request.GET.get(name) and parse_filter_date(request.GET[name]) is None:
+            return error_response(f'{name} deve ser uma data no formato AAAA-MM-DD')
+    queryset = filter_activities(api_queryset(fields), request.GET)
+
+    if request.GET.get('format') == 'ndjson':
+        return stream_ndjson(request, queryset, fields)
+
+    try:
+        limit = min(max(int(request.GET.get('limit', DEFAULT_LIMIT)), 1), MAX_LIMIT)
+    except ValueError:
+        return error_response('limit deve ser um número inteiro')
+
+    # Ao contrário das páginas HTML, um cursor inválido não volta ao início:
+    # o cliente repetiria linhas sem perceber
+    try:
+        page = KeysetPaginator(queryset, per_page=limit).page(request.GET.get('cursor'))
+    except InvalidCursor:
+        return error_response('cursor inválido')
+    return JsonResponse({
+        'results': [serialize_activity(activity, fields) for activity in page],
+        'next': page_url(request, page.next_cursor),
+        'previous': page_url(request, page.previous_cursor),
+    })
+
+
+def page_url(request, cursor):
+    if cursor is None:
+        return None
+    params = request.GET.copy()
+    params['cursor'] = cursor
+    return request.build_absolute_uri(f'{request.path}?{params.urlencode()}')
+
+
+def stream_ndjson(request, queryset, fields):
+    """Exporta todas as atividades, uma por linha, sem montar a lista em memória"""
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+
+    def rows():
+        for activity in queryset.order_by(*KeysetPaginator.ordering).iterator(chunk_size=STREAM_CHUNK_SIZE):
+            yield encoder.encode(serialize_activity(activity, fields)) + '\n'
+
+    return StreamingHttpResponse(
+        streaming_content(request, rows()), content_type='application/x-ndjson; charset=utf-8',
+    )
+
+
+@require_GET
+def api_activity_detail(request, pk):
+    try:
+        fields = parse_fields(request.GET.get('fields'))
+    except InvalidFields as exc:
+        return error_response(str(exc))
+
+    activity = api_queryset(fields).filter(pk=pk).first()
+    if activity is None:
+        return error_response('Atividade não encontrada', status=404)
+    return JsonResponse(serialize_activity(activity, fields))
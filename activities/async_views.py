@@ -0,0 +1,81 @@
+"""
+Versões assíncronas (ASGI) das páginas públicas de leitura.
+
+Usadas no lugar das views de views.py quando ASYNC_VIEWS está ligado (ver
+urls.py). Renderizam os mesmos templates com o mesmo contexto e passam pelos
+mesmos decorators de cache, mas esperam o banco com o ORM assíncrono
+(acount, aget, async for) em vez de ocupar uma thread durante a consulta.
+"""
+from django.core.paginator import InvalidPage, Paginator
+from django.http import Http404
+from django.template.response import TemplateResponse
+
+from .cache import cache_public_page, conditional_page
+from .facets import aget_facets
+from .forms import ActivitySearchForm
+from .models import Activity
+from .stats import aget_dashboard_stats
+from .views import (
+    ActivityListView, activity_detail_validators, activity_list_queryset,
+    activity_list_validators, facet_context, page_or_fragment, search_paginator,
+)
+
+
+@cache_public_page
+async def dashboard_view(request):
+    return TemplateResponse(request, 'dashboard/index.html', await aget_dashboard_stats())
+
+
+async def search_view(request):
+    page = await search_paginator(request.GET).aget_page(request.GET.get('cursor'))
+    context = {
+        'activities': page.object_list,
+        'page': page,
+        'activity_types': Activity.ACTIVITY_TYPES,
+        'status_choices': Activity.STATUS_CHOICES,
+        **facet_context(await aget_facets(request.GET)),
+    }
+    return page_or_fragment(request, 'activities/search.html', 'activities/partials/search_results.html', context)
+
+
+@conditional_page(activity_list_validators)
+@cache_public_page
+async def activity_list_view(request):
+    queryset = activity_list_queryset(request.GET)
+    paginator = Paginator(queryset, ActivityListView.paginate_by)
+    # Paginator.count faria um COUNT síncrono; o valor é preenchido antes
+    paginator.count = await queryset.acount()
+    facets = await aget_facets(request.GET)
+    # Como o ListView: ?page=last vale, página inválida ou vazia é 404
+    page_number = request.GET.get('page') or 1
+    if page_number == 'last':
+        page_number = paginator.num_pages
+    try:
+        page = paginator.page(page_number)
+    except InvalidPage as exc:
+        raise Http404(f'Página inválida ({page_number}): {exc}')
+    page.object_list = [activity async for activity in page.object_list]
+    context = {
+        'activities': page.object_list,
+        'object_list': page.object_list,
+        'page_obj': page,
+        'paginator': paginator,
+        'is_paginated': page.has_other_pages(),
+        'search_form': ActivitySearchForm(request.GET),
+        'activity_types': Activity.ACTIVITY_TYPES,
+        'status_choices': Activity.STATUS_CHOICES,
+        **facet_context(facets),
+    }
+    return page_or_fragment(
+        request, ActivityListView.template_name, 'activities/partials/activity_results.html', context,
+    )
+
+
+@conditional_page(activity_detail_validators)
+@cache_public_page
+async def activity_detail_view(request, pk):
+    try:
+        activity = await Activity.objects.prefetch_related('tags', 'requirements').aget(pk=pk)
+    except Activity.DoesNotExist:
+        raise Http404('Atividade não encontrada')
+    return TemplateResponse(request, 'activities/detail.html', {'activity': activity, 'object': activity})
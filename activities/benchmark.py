@@ -0,0 +1,119 @@
+"""
+Benchmark das URLs do app usando o Client de teste do Django.
+
+Cada cenário é requisitado algumas vezes para aquecer caches e depois medido:
+latência (p50/p95), quantidade de consultas e pico de memória alocada durante
+a requisição. O relatório é um dicionário pronto para ser salvo em JSON e
+comparado entre versões.
+"""
+import platform
+import statistics
+import time
+import tracemalloc
+
+import django
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import urls
+from .models import Activity
+
+# Variações com filtros que exercitam caminhos diferentes das mesmas views
+EXTRA_SCENARIOS = [
+    ('activity_list?search', 'activity_list', {'search': 'python'}),
+    ('activity_list?type+status', 'activity_list', {'type': 'COURSE', 'status': 'UPCOMING'}),
+    ('search?search', 'search', {'search': 'curso'}),
+    ('activity_list?search+partial', 'activity_list', {'search': 'python', 'partial': 1}),
+    ('search?search+partial', 'search', {'search': 'curso', 'partial': 1}),
+    ('api_activity_list?fields', 'api_activity_list', {'fields': 'id,title,tags', 'limit': 100}),
+]
+
+
+def percentile(samples, percent):
+    ordered = sorted(samples)
+    if len(ordered) == 1:
+        return ordered[0]
+    return statistics.quantiles(ordered, n=100, method='inclusive')[percent - 1]
+
+
+def build_scenarios(sample_pk):
+    """Um cenário por URL de activities/urls.py, mais as variações de EXTRA_SCENARIOS"""
+    scenarios = []
+    for pattern in urls.urlpatterns:
+        kwargs = {'pk': sample_pk} if 'pk' in pattern.pattern.converters else {}
+        if kwargs and sample_pk is None:
+            continue
+        scenarios.append((pattern.name, reverse(pattern.name, kwargs=kwargs), {}))
+    for name, url_name, params in EXTRA_SCENARIOS:
+        scenarios.append((name, reverse(url_name), params))
+    return scenarios
+
+
+def request(client, url, params):
+    response = client.get(url, params)
+    if response.streaming:
+        # Consome o conteúdo para medir a geração completa
+        for _ in response.streaming_content:
+            pass
+    return response
+
+
+def measure(client, url, params, iterations, warmup=1, cold_cache=False):
+    for _ in range(warmup):
+        request(client, url, params)
+
+    timings, queries = [], []
+    for _ in range(iterations):
+        if cold_cache:
+            cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            response = request(client, url, params)
+            timings.append((time.perf_counter() - started) * 1000)
+        queries.append(len(ctx.captured_queries))
+
+    # A memória é medida numa requisição à parte: o tracemalloc distorce as latências
+    if cold_cache:
+        cache.clear()
+    tracemalloc.start()
+    try:
+        request(client, url, params)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'url': url,
+        'params': params,
+        'status': response.status_code,
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'queries': int(statistics.median(queries)),
+        'max_queries': max(queries),
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+
+def run_benchmark(iterations=20, warmup=1, cold_cache=False, progress=None):
+    client = Client()
+    sample = Activity.objects.order_by('-created_at', '-pk').values_list('pk', flat=True).first()
+    results = {}
+    for name, url, params in build_scenarios(sample):
+        results[name] = measure(client, url, params, iterations, warmup=warmup, cold_cache=cold_cache)
+        if progress:
+            progress(name, results[name])
+    return {
+        'generated_at': timezone.now().isoformat(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'activities': Activity.objects.count(),
+        'iterations': iterations,
+        'cold_cache': cold_cache,
+        'results': results,
+    }
@@ -0,0 +1,219 @@
+"""
+Cache das páginas públicas (lista, detalhe e dashboard).
+
+As chaves levam uma versão global que os signals incrementam a cada mudança em
+atividades, tags ou requisitos: as entradas antigas simplesmente deixam de ser
+lidas e expiram sozinhas, sem precisar limpar o cache inteiro.
+
+Com réplicas de leitura, uma requisição pode guardar sob a versão nova dados
+lidos de uma réplica que ainda não recebeu a escrita. Por isso quem acabou de
+escrever (fixado no principal) não lê estes caches, e o que vem de uma réplica
+só fica guardado por REPLICA_PIN_SECONDS, o atraso que as réplicas podem ter.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from . import routers
+from .middleware import ACCESSIBILITY_PARAMS, get_accessibility_preferences
+
+PAGES_VERSION_KEY = 'activities:pages-version'
+TAGS_VERSION_KEY = 'activities:tags-version'
+
+
+def use_shared_cache():
+    """Falso para quem acabou de escrever: o cache pode ter dados de uma réplica atrasada"""
+    return not routers.is_pinned()
+
+
+def shared_timeout(timeout):
+    """Timeout de uma entrada do cache, limitado ao atraso das réplicas se ela veio de uma"""
+    if routers.reading_from_replica():
+        lag = getattr(settings, 'REPLICA_PIN_SECONDS', 10)
+        return lag if timeout is None else min(timeout, lag)
+    return timeout
+
+
+def get_version(key):
+    version = cache.get(key)
+    if version is None:
+        # Começa de um valor baseado no relógio para não reaproveitar versões
+        # antigas caso a chave tenha sido descartada pelo cache
+        cache.add(key, int(time.time() * 1000), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        get_version(key)
+
+
+def get_pages_version():
+    return get_version(PAGES_VERSION_KEY)
+
+
+def bump_pages_version():
+    bump_version(PAGES_VERSION_KEY)
+
+
+def get_tags_version():
+    """Versão das tags, usada na chave do cache dos cards (partials/activity_card.html)"""
+    return get_version(TAGS_VERSION_KEY)
+
+
+def bump_tags_version():
+    bump_version(TAGS_VERSION_KEY)
+
+
+def normalized_querystring(request):
+    """Querystring em ordem canônica, sem parâmetros vazios nem de acessibilidade"""
+    items = sorted(
+        (key, value)
+        for key, values in request.GET.lists()
+        if key not in ACCESSIBILITY_PARAMS
+        for value in values
+        if value != ''
+    )
+    return '&'.join(f'{key}={value}' for key, value in items)
+
+
+def page_cache_key(request):
+    preferences = get_accessibility_preferences(request)
+    raw = '|'.join([
+        request.path,
+        normalized_querystring(request),
+        ','.join(f'{key}={value}' for key, value in sorted(preferences.items())),
+    ])
+    return 'activities:page:' + hashlib.md5(raw.encode()).hexdigest()
+
+
+def is_cacheable_request(request):
+    # Páginas com mensagens pendentes (ex.: "Atividade criada com sucesso!") não
+    # podem ser servidas do cache nem armazenadas nele
+    return request.method in ('GET', 'HEAD') and not len(get_messages(request)) and use_shared_cache()
+
+
+def cache_public_page(view_func):
+    """
+    Guarda a resposta renderizada da view no cache versionado das páginas públicas.
+    Funciona com views síncronas e assíncronas.
+    """
+
+    def lookup(request):
+        """(chave, versão, resposta em cache); chave None se a requisição não pode usar o cache"""
+        if not is_cacheable_request(request):
+            return None, None, None
+        key = page_cache_key(request)
+        version = get_pages_version()
+        return key, version, cache.get(key, version=version)
+
+    def remember(response, key, version):
+        if response.status_code == 200 and not response.streaming:
+            timeout = shared_timeout(getattr(settings, 'PAGE_CACHE_TIMEOUT', 600))
+
+            def store(response):
+                cache.set(key, response, timeout, version=version)
+
+            if hasattr(response, 'render') and callable(response.render) and not response.is_rendered:
+                response.add_post_render_callback(store)
+            else:
+                store(response)
+        return response
+
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def async_wrapper(request, *args, **kwargs):
+            key, version, response = await sync_to_async(lookup)(request)
+            if response is not None:
+                return response
+            response = await view_func(request, *args, **kwargs)
+            if key is None:
+                return response
+            return await sync_to_async(remember)(response, key, version)
+
+        return async_wrapper
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        key, version, response = lookup(request)
+        if response is not None:
+            return response
+        response = view_func(request, *args, **kwargs)
+        if key is None:
+            return response
+        return remember(response, key, version)
+
+    return wrapper
+
+
+def conditional_page(get_validators):
+    """
+    Responde 304 quando o ETag/Last-Modified do navegador ainda é válido.
+
+    ``get_validators(request, *args, **kwargs)`` devolve ``(last_modified, fingerprint)``
+    do conteúdo da página; o resultado fica no cache versionado, então uma
+    página sem alterações não custa nenhuma consulta para ser validada.
+    Funciona com views síncronas e assíncronas (get_validators é sempre síncrona).
+    """
+
+    def validate(request, *args, **kwargs):
+        """(validadores, resposta 304 ou None); validadores None se a requisição não pode usar o cache"""
+        if not is_cacheable_request(request):
+            return None, None
+
+        key = 'activities:validators:' + page_cache_key(request)
+        version = get_pages_version()
+        validators = cache.get(key, version=version)
+        if validators is None:
+            last_modified, fingerprint = get_validators(request, *args, **kwargs)
+            validators = (
+                f'"{hashlib.md5(f"{key}|{fingerprint}".encode()).hexdigest()}"',
+                int(last_modified.timestamp()) if last_modified else None,
+            )
+            timeout = shared_timeout(getattr(settings, 'PAGE_CACHE_TIMEOUT', 600))
+            cache.set(key, validators, timeout, version=version)
+        etag, last_modified = validators
+        return validators, get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+    def add_headers(response, validators):
+        etag, last_modified = validators
+        if response.status_code in (200, 304):
+            response.headers.setdefault('ETag', etag)
+            if last_modified:
+                response.headers.setdefault('Last-Modified', http_date(last_modified))
+            # O navegador guarda a página mas sempre revalida antes de reutilizá-la
+            patch_cache_control(response, no_cache=True)
+        return response
+
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def async_wrapper(request, *args, **kwargs):
+                validators, response = await sync_to_async(validate)(request, *args, **kwargs)
+                if response is None:
+                    response = await view_func(request, *args, **kwargs)
+                return add_headers(response, validators) if validators else response
+
+            return async_wrapper
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            validators, response = validate(request, *args, **kwargs)
+            if response is None:
+                response = view_func(request, *args, **kwargs)
+            return add_headers(response, validators) if validators else response
+
+        return wrapper
+
+    return decorator
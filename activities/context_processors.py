@@ -1,16 +1,14 @@
 from datetime import datetime
 
+from .middleware import get_accessibility_preferences
+
 
 def accessibility_settings(request):
     """
     Context processor que disponibiliza as preferências de acessibilidade
     para todos os templates.
     """
-    return {
-        'font_size': request.session.get('font_size', 'normal'),
-        'contrast': request.session.get('contrast', 'normal'),
-        'dyslexia': request.session.get('dyslexia', False),
-    }
+    return get_accessibility_preferences(request)
 
 
 def current_year(request):
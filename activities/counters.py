@@ -0,0 +1,118 @@
+"""
+Contadores de atividades por tipo e status (tabela ActivityCounter).
+
+Os signals mantêm a tabela a cada criação, mudança de tipo/status e exclusão,
+e o importador aplica os deltas de cada lote; assim o dashboard e os filtros
+da listagem leem poucas linhas em vez de agregar a tabela de atividades.
+Escritas que não passam por nenhum dos dois (``QuerySet.update``, SQL direto)
+deixam os contadores defasados: ``manage.py rebuild_counters`` os recalcula.
+"""
+from collections import Counter
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F
+
+from .cache import get_pages_version, shared_timeout, use_shared_cache
+from .filters import status_filter_counts
+from .models import Activity, ActivityCounter
+
+COUNTS_CACHE_KEY = 'activities:counters:{version}'
+COUNTS_CACHE_TIMEOUT = 60 * 60
+
+
+def apply_deltas(deltas):
+    """Soma ``{(tipo, status): n}`` aos contadores, criando os que faltam"""
+    for (activity_type, status), delta in deltas.items():
+        if not delta:
+            continue
+        counter = ActivityCounter.objects.filter(type=activity_type, status=status)
+        if not counter.update(count=F('count') + delta):
+            # ignore_conflicts: outra transação pode ter criado o contador agora
+            ActivityCounter.objects.bulk_create(
+                [ActivityCounter(type=activity_type, status=status)], ignore_conflicts=True,
+            )
+            counter.update(count=F('count') + delta)
+
+
+def transition(old, new):
+    """Deltas de uma atividade que passou de ``old`` para ``new`` (None: criada ou excluída)"""
+    deltas = Counter()
+    if old != new:
+        if old is not None:
+            deltas[old] -= 1
+        if new is not None:
+            deltas[new] += 1
+    return deltas
+
+
+def rebuild_counters():
+    """Recalcula os contadores a partir das atividades; devolve o que mudou"""
+    with transaction.atomic():
+        before = read_counts()
+        after = dict(
+            ((row['type'], row['status']), row['count'])
+            for row in Activity.objects.order_by().values('type', 'status').annotate(count=Count('pk'))
+        )
+        ActivityCounter.objects.all().delete()
+        ActivityCounter.objects.bulk_create([
+            ActivityCounter(type=activity_type, status=status, count=count)
+            for (activity_type, status), count in after.items()
+        ])
+    return {
+        key: (before.get(key, 0), after.get(key, 0))
+        for key in before.keys() | after.keys()
+        if before.get(key, 0) != after.get(key, 0)
+    }
+
+
+def read_counts():
+    return {(c.type, c.status): c.count for c in ActivityCounter.objects.filter(count__gt=0)}
+
+
+def get_counts():
+    """
+    Contadores não zerados. Ficam no cache junto com a versão das páginas, que
+    muda a cada alteração nas atividades, então não precisam ser invalidados.
+    """
+    key = COUNTS_CACHE_KEY.format(version=get_pages_version())
+    counts = cache.get(key) if use_shared_cache() else None
+    if counts is None:
+        counts = read_counts()
+        cache.set(key, counts, shared_timeout(COUNTS_CACHE_TIMEOUT))
+    return counts
+
+
+async def aget_counts():
+    return await sync_to_async(get_counts)()
+
+
+def type_counts(counts):
+    totals = Counter()
+    for (activity_type, _), count in counts.items():
+        totals[activity_type] += count
+    return dict(totals)
+
+
+def status_counts(counts):
+    """Quantidade por valor do filtro de status (UPCOMING e ACTIVE somam os equivalentes)"""
+    by_status = Counter()
+    for (_, status), count in counts.items():
+        by_status[status] += count
+    return status_filter_counts(by_status)
+
+
+def dashboard_totals(counts):
+    """Os números do dashboard (ver stats.build_dashboard_stats) a partir dos contadores"""
+    by_status = status_counts(counts)
+    totals = {
+        'total_activities': sum(counts.values()),
+        'active_activities': by_status['ACTIVE'],
+        'upcoming_activities': by_status['UPCOMING'],
+        'completed_activities': by_status['COMPLETED'],
+    }
+    by_type = type_counts(counts)
+    for activity_type, _ in Activity.ACTIVITY_TYPES:
+        totals[f'type_{activity_type}'] = by_type.get(activity_type, 0)
+    return totals
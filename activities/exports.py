@@ -0,0 +1,192 @@
+"""
+Exportação das atividades em CSV e XLSX.
+
+As duas saídas são geradas linha a linha a partir de um iterator() do queryset,
+então a memória usada não depende da quantidade de atividades exportadas e os
+primeiros bytes saem assim que o primeiro bloco é lido do banco.
+"""
+import csv
+import itertools
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.utils import timezone
+
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_COLUMNS = [
+    ('Título', lambda a: a.title),
+    ('Tipo', lambda a: a.get_type_display()),
+    ('Status', lambda a: a.get_status_display()),
+    ('Data de Início', lambda a: a.start_date.strftime('%d/%m/%Y')),
+    ('Data de Término', lambda a: a.end_date.strftime('%d/%m/%Y')),
+    ('Horário', lambda a: a.time.strftime('%H:%M') if a.time else ''),
+    ('Local', lambda a: a.location),
+    ('Coordenador', lambda a: a.coordinator),
+    ('Participantes', lambda a: a.participants),
+    ('Tags', lambda a: ', '.join(tag.name for tag in a.tags.all())),
+    ('Criado em', lambda a: timezone.localtime(a.created_at).strftime('%d/%m/%Y %H:%M')),
+]
+
+
+def export_rows(queryset):
+    """Cabeçalho seguido de uma linha por atividade"""
+    yield [name for name, _ in EXPORT_COLUMNS]
+    for activity in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield [value(activity) for _, value in EXPORT_COLUMNS]
+
+
+def streaming_content(request, chunks, batch_size=100):
+    """
+    Conteúdo para o StreamingHttpResponse. Em ASGI o Django lê um iterador
+    síncrono inteiro para a memória antes de enviar a resposta, o que anula o
+    streaming; lá os blocos são gerados numa thread, ``batch_size`` por vez,
+    e entregues por um iterador assíncrono.
+    """
+    if not isinstance(request, ASGIRequest):
+        return chunks
+
+    chunks = iter(chunks)
+    next_batch = sync_to_async(lambda: list(itertools.islice(chunks, batch_size)))
+
+    async def stream():
+        while batch := await next_batch():
+            for chunk in batch:
+                yield chunk
+
+    return stream()
+
+
+class Echo:
+    """Objeto "arquivo" que devolve o que recebe, para o csv.writer gerar strings"""
+
+    def write(self, value):
+        return value
+
+
+# Início de célula que o Excel/LibreOffice interpretam como fórmula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def csv_cell(value):
+    """Textos que viram fórmula ao abrir o CSV ganham um ' na frente (CSV injection)"""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def stream_csv(rows):
+    writer = csv.writer(Echo())
+    # BOM para o Excel reconhecer o arquivo como UTF-8 (acentos)
+    yield '\ufeff'
+    for row in rows:
+        yield writer.writerow([csv_cell(value) for value in row])
+
+
+class StreamBuffer:
+    """Destino não pesquisável para o ZipFile; os bytes são retirados a cada bloco"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+XLSX_STATIC_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Atividades" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+# Caracteres de controle que não são permitidos em XML
+ILLEGAL_XML_CHARS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def column_letter(index):
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def xlsx_cell(ref, value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f'<c r="{ref}"><v>{value}</v></c>'
+    text = escape(ILLEGAL_XML_CHARS.sub('', str(value)))
+    return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def stream_xlsx(rows, flush_every=500):
+    """
+    Gera uma planilha XLSX mínima (uma aba, textos inline) em streaming.
+
+    O ZipFile escreve num destino não pesquisável, o que o faz usar descritores
+    de dados em vez de voltar ao cabeçalho de cada arquivo; assim o conteúdo
+    pode ser enviado ao cliente enquanto a planilha ainda está sendo gerada.
+    """
+    buffer = StreamBuffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in XLSX_STATIC_PARTS.items():
+            archive.writestr(name, content)
+        yield buffer.drain()
+
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            for number, row in enumerate(rows, start=1):
+                cells = ''.join(
+                    xlsx_cell(f'{column_letter(index)}{number}', value) for index, value in enumerate(row)
+                )
+                sheet.write(f'<row r="{number}">{cells}</row>'.encode())
+                if number % flush_every == 0:
+                    yield buffer.drain()
+            sheet.write(b'</sheetData></worksheet>')
+    yield buffer.drain()
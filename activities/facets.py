@@ -0,0 +1,140 @@
+"""
+Contagens por faceta (tipo, status, tag e mês de início) da busca atual.
+
+As facetas são disjuntivas: cada uma é contada com todos os filtros da
+busca menos o seu, então escolher um tipo não zera as outras opções de tipo.
+Cada faceta fica no cache pela versão das páginas e pelos filtros que a
+afetam (normalizados), logo refinar a busca por tag reaproveita a contagem
+de tags e só recalcula as demais. As que faltam no cache são calculadas
+juntas, em uma única consulta (UNION ALL de um GROUP BY por faceta).
+"""
+import hashlib
+from datetime import date
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db.models import CharField, Count, F, Value
+from django.db.models.functions import Cast, TruncMonth
+
+from .cache import get_pages_version, shared_timeout, use_shared_cache
+from .counters import get_counts, status_counts, type_counts
+from .filters import filter_activities, status_filter_counts
+from .models import Activity, normalize_tag_name
+
+# Faceta -> parâmetro da querystring que ela filtra
+FACETS = {'type': 'type', 'status': 'status', 'tag': 'tag', 'month': 'month'}
+FILTER_PARAMS = ('search', 'type', 'status', 'tag', 'month', 'start_date', 'end_date')
+FACETS_CACHE_KEY = 'activities:facets:{version}:{facet}:{filters}'
+FACETS_CACHE_TIMEOUT = 60 * 60
+TAG_FACET_LIMIT = 12
+
+
+def normalized_filters(params, exclude=None):
+    """Filtros preenchidos de ``params``, sem ``exclude``, em ordem fixa e sem espaços extras"""
+    filters = []
+    for name in FILTER_PARAMS:
+        value = ' '.join((params.get(name) or '').split())
+        if name == 'tag':
+            value = normalize_tag_name(value)
+        if value and name != exclude:
+            filters.append((name, value))
+    return tuple(filters)
+
+
+def facet_cache_key(facet, filters, version):
+    digest = hashlib.md5(repr(filters).encode()).hexdigest()
+    return FACETS_CACHE_KEY.format(version=version, facet=facet, filters=digest)
+
+
+def facet_values(facet):
+    if facet == 'tag':
+        return F('tags__name')
+    if facet == 'month':
+        return Cast(TruncMonth('start_date'), CharField())
+    return F(facet)
+
+
+def facet_query(facet, filters):
+    """``(faceta, valor, quantidade)`` das atividades que casam com ``filters``"""
+    queryset = filter_activities(Activity.objects.order_by(), dict(filters))
+    return (
+        queryset
+        .annotate(facet=Value(facet, output_field=CharField()), value=facet_values(facet))
+        .values_list('facet', 'value')
+        .annotate(count=Count('pk'))
+    )
+
+
+def facets_query(filters_by_facet):
+    """Consulta única (UNION ALL) com as facetas de ``{faceta: filtros}``"""
+    queries = [facet_query(facet, filters) for facet, filters in filters_by_facet.items()]
+    return queries[0].union(*queries[1:], all=True) if len(queries) > 1 else queries[0]
+
+
+def compute_facets(filters_by_facet):
+    """Calcula as facetas de ``{faceta: filtros}`` em uma consulta só"""
+    raw = {facet: {} for facet in filters_by_facet}
+    for facet, value, count in facets_query(filters_by_facet):
+        if value is not None:
+            raw[facet][value] = count
+
+    facets = {}
+    for facet, counts in raw.items():
+        if facet == 'status':
+            counts = status_filter_counts(counts)
+        elif facet == 'tag':
+            top = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:TAG_FACET_LIMIT]
+            counts = dict(top)
+        elif facet == 'month':
+            # TruncMonth convertido em texto: "2025-03-01" (ou com a hora, conforme o banco)
+            counts = dict(sorted(
+                (date(int(value[:4]), int(value[5:7]), 1), count) for value, count in counts.items()
+            ))
+        facets[facet] = counts
+    return facets
+
+
+def queried_facets(params):
+    """``{faceta: filtros}`` das facetas que dependem de consulta às atividades"""
+    queried = {}
+    for facet, param in FACETS.items():
+        filters = normalized_filters(params, exclude=param)
+        # Tipo e status sem outros filtros: a tabela de contadores já tem a resposta
+        if filters or facet not in ('type', 'status'):
+            queried[facet] = filters
+    return queried
+
+
+def get_facets(params):
+    """
+    ``{'type': {...}, 'status': {...}, 'tag': {...}, 'month': {...}}`` com a
+    quantidade de atividades por opção de cada filtro, dados os demais filtros.
+    """
+    version = get_pages_version()
+    facets, keys = {}, {}
+    queried = queried_facets(params)
+    for facet in FACETS:
+        if facet in queried:
+            keys[facet] = (facet_cache_key(facet, queried[facet], version), queried[facet])
+        else:
+            counts = get_counts()
+            facets[facet] = type_counts(counts) if facet == 'type' else status_counts(counts)
+
+    cached = cache.get_many([key for key, _ in keys.values()]) if use_shared_cache() else {}
+    missing = {}
+    for facet, (key, filters) in keys.items():
+        if key in cached:
+            facets[facet] = cached[key]
+        else:
+            missing[facet] = filters
+    if missing:
+        computed = compute_facets(missing)
+        cache.set_many(
+            {keys[facet][0]: counts for facet, counts in computed.items()}, shared_timeout(FACETS_CACHE_TIMEOUT),
+        )
+        facets.update(computed)
+    return {facet: facets[facet] for facet in FACETS}
+
+
+async def aget_facets(params):
+    return await sync_to_async(get_facets)(params)
@@ -0,0 +1,80 @@
+from datetime import date
+
+from django.utils.dateparse import parse_date
+
+from .models import Activity, normalize_tag_name
+from .search import search_activities
+
+# Filtros de status da interface que agrupam valores equivalentes
+STATUS_FILTER_GROUPS = {
+    'UPCOMING': ['PENDING', 'UPCOMING'],
+    'ACTIVE': ['IN_PROGRESS', 'ACTIVE'],
+}
+
+
+def filter_activities(queryset, params, ranked=False):
+    """
+    Aplica os filtros de busca (search, type, status, tag, month, start_date,
+    end_date) recebidos em ``params`` (normalmente ``request.GET``).
+    """
+    search = params.get('search')
+    if search:
+        queryset = search_activities(queryset, search, ranked=ranked)
+
+    activity_type = params.get('type')
+    if activity_type:
+        queryset = queryset.filter(type=activity_type)
+
+    status = params.get('status')
+    if status:
+        if status in STATUS_FILTER_GROUPS:
+            queryset = queryset.filter(status__in=STATUS_FILTER_GROUPS[status])
+        else:
+            queryset = queryset.filter(status=status)
+
+    tag = params.get('tag')
+    if tag:
+        queryset = queryset.filter(tags__name=normalize_tag_name(tag))
+
+    month = parse_month(params.get('month'))
+    if month:
+        # Intervalo de datas (e não __month) para usar o índice de start_date
+        year, month = month
+        next_month = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+        queryset = queryset.filter(start_date__gte=date(year, month, 1), start_date__lt=next_month)
+
+    start_date = parse_filter_date(params.get('start_date'))
+    if start_date:
+        queryset = queryset.filter(start_date__gte=start_date)
+
+    end_date = parse_filter_date(params.get('end_date'))
+    if end_date:
+        queryset = queryset.filter(start_date__lte=end_date)
+
+    return queryset
+
+
+def status_filter_counts(by_status):
+    """``{status: n}`` -> quantidade por valor do filtro de status (UPCOMING e ACTIVE somam os equivalentes)"""
+    return {
+        status: sum(by_status.get(value, 0) for value in STATUS_FILTER_GROUPS.get(status, [status]))
+        for status, _ in Activity.STATUS_CHOICES
+    }
+
+
+def parse_filter_date(value):
+    """ "2025-03-10" -> date; valores inválidos são ignorados"""
+    try:
+        return parse_date(value or '')
+    except ValueError:
+        return None
+
+
+def parse_month(value):
+    """ "2025-03" -> (2025, 3); valores inválidos são ignorados"""
+    try:
+        year, month = map(int, (value or '').split('-'))
+    except ValueError:
+        return None
+    # Até 9998: o mês seguinte (fim do intervalo) ainda precisa ser uma data válida
+    return (year, month) if 1 <= year <= 9998 and 1 <= month <= 12 else None
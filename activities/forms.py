@@ -1,5 +1,6 @@
 from django import forms
-from .models import Activity, ActivityTag
+from django.db import transaction
+from .models import Activity, ActivityTag, normalize_tag_name
 
 FORM_INPUT_CLASS = 'w-full px-4 py-3 bg-white border-2 border-gray-200 rounded-lg text-base transition-all duration-200 focus:border-blue-500 focus:outline-none hover:border-blue-300 placeholder-gray-400'
 
@@ -63,7 +64,7 @@ class ActivityForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         if self.instance and self.instance.pk:
-            tags_str = ', '.join([tag.name for tag in self.instance.tags.all()])
+            tags_str = ', '.join(self.instance.tags.values_list('name', flat=True))
             self.fields['tags'].initial = tags_str
 
     def clean_title(self):
@@ -80,9 +81,12 @@ class ActivityForm(forms.ModelForm):
 
     def clean_tags(self):
         tags = self.cleaned_data.get('tags', '')
-        tag_list = [tag.strip() for tag in tags.split(',') if tag.strip()]
+        tag_list = [normalize_tag_name(tag) for tag in tags.split(',') if tag.strip()]
         if len(tag_list) == 0:
             raise forms.ValidationError('Adicione pelo menos uma tag')
+        max_length = ActivityTag._meta.get_field('name').max_length
+        if any(len(tag) > max_length for tag in tag_list):
+            raise forms.ValidationError(f'Cada tag deve ter no máximo {max_length} caracteres')
         return tags
 
     def clean(self):
@@ -100,17 +104,10 @@ class ActivityForm(forms.ModelForm):
     def save(self, commit=True):
         instance = super().save(commit=False)
         if commit:
-            instance.save()
-            tags_str = self.cleaned_data.get('tags', '')
-            if tags_str:
-                tag_names = [tag.strip() for tag in tags_str.split(',') if tag.strip()]
-                tags = []
-                for tag_name in tag_names:
-                    tag, created = ActivityTag.objects.get_or_create(name=tag_name)
-                    tags.append(tag)
-                instance.tags.set(tags)
-            else:
-                instance.tags.clear()
+            with transaction.atomic():
+                instance.save()
+                tags_str = self.cleaned_data.get('tags', '')
+                instance.tags.set(ActivityTag.objects.resolve(tags_str.split(',')))
         return instance
 
 
@@ -0,0 +1,143 @@
+"""
+Versões redimensionadas das imagens enviadas em ``Activity.image``.
+
+Depois que a atividade é salva com uma imagem nova, as variações (card,
+detalhe e as versões 2x para telas retina, em WebP e JPEG) são geradas num
+pool de threads, fora da requisição. O resultado fica em
+``Activity.image_variants``:
+
+    {"source": "activities/foto.jpg",
+     "card": {"width": 400, "height": 225, "webp": "activities/variants/7/card-3f2a9c1b0d4e.webp", ...},
+     ...}
+
+O nome de cada arquivo leva um hash do conteúdo da imagem original, então
+uma imagem nova gera URLs novas (o navegador e a CDN não servem a antiga) e
+os arquivos da imagem anterior são apagados.
+"""
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .cache import bump_pages_version
+from .models import Activity
+
+logger = logging.getLogger(__name__)
+
+# Nome -> (largura, proporção para recorte ou None para manter a original)
+IMAGE_VARIANTS = {
+    'card': (400, 16 / 9),
+    'card_2x': (800, 16 / 9),
+    'detail': (960, None),
+    'detail_2x': (1920, None),
+}
+IMAGE_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+VARIANTS_DIR = 'activities/variants'
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'IMAGE_WORKERS', 2), thread_name_prefix='activity-images',
+        )
+    return _executor
+
+
+def resize(image, width, ratio):
+    if ratio:
+        return ImageOps.fit(image, (min(width, image.width), round(min(width, image.width) / ratio)))
+    if image.width <= width:
+        return image.copy()
+    return image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+
+
+def render_variants(source, activity_id):
+    """Gera e grava todas as variações; devolve o dicionário para image_variants"""
+    with default_storage.open(source) as handle:
+        content = handle.read()
+    digest = hashlib.sha256(content).hexdigest()[:12]
+    image = ImageOps.exif_transpose(Image.open(BytesIO(content))).convert('RGB')
+
+    variants = {'source': source}
+    for name, (width, ratio) in IMAGE_VARIANTS.items():
+        resized = resize(image, width, ratio)
+        variant = {'width': resized.width, 'height': resized.height}
+        for extension, (image_format, options) in IMAGE_FORMATS.items():
+            buffer = BytesIO()
+            resized.save(buffer, image_format, **options)
+            path = f'{VARIANTS_DIR}/{activity_id}/{name}-{digest}.{extension}'
+            default_storage.delete(path)
+            variant[extension] = default_storage.save(path, ContentFile(buffer.getvalue()))
+        variants[name] = variant
+    return variants
+
+
+def variant_paths(variants):
+    return {
+        path
+        for name in IMAGE_VARIANTS
+        for extension in IMAGE_FORMATS
+        if (path := (variants.get(name) or {}).get(extension))
+    }
+
+
+def delete_variants(variants, keep=None):
+    """Apaga os arquivos das variações, menos os que também estão em ``keep``"""
+    for path in variant_paths(variants) - variant_paths(keep or {}):
+        default_storage.delete(path)
+
+
+def generate_variants(activity_id):
+    """Gera as variações da imagem atual da atividade (se ela ainda existir)"""
+    activity = Activity.objects.filter(pk=activity_id).only('image', 'image_variants').first()
+    if activity is None or not activity.image:
+        return None
+    source = activity.image.name
+    previous = activity.image_variants
+    variants = render_variants(source, activity_id)
+    # Só grava se a imagem não mudou enquanto as variações eram geradas;
+    # update() não dispara signals, então o cache das páginas é invalidado aqui
+    updated = Activity.objects.filter(pk=activity_id, image=source).update(
+        image_variants=variants, updated_at=timezone.now(),
+    )
+    if not updated:
+        # Outra imagem foi enviada nesse meio-tempo: estas variações já nasceram velhas
+        delete_variants(variants, keep=previous)
+        return None
+    delete_variants(previous, keep=variants)
+    bump_pages_version()
+    return variants
+
+
+def _run_in_worker(activity_id):
+    try:
+        generate_variants(activity_id)
+    except Exception:
+        logger.exception('Falha ao gerar as variações da imagem da atividade %s', activity_id)
+    finally:
+        close_old_connections()
+
+
+def schedule_variants(activity_id):
+    """Gera as variações depois do commit, no pool de threads (ou na hora, se IMAGE_WORKERS = 0)"""
+    if getattr(settings, 'IMAGE_WORKERS', 2) == 0:
+        transaction.on_commit(lambda: generate_variants(activity_id))
+    else:
+        transaction.on_commit(lambda: get_executor().submit(_run_in_worker, activity_id))
+
+
+def variants_are_stale(activity):
+    return bool(activity.image) and activity.image_variants.get('source') != activity.image.name
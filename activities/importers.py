@@ -0,0 +1,200 @@
+"""
+Importação de atividades em lote.
+
+Os registros são lidos em streaming, validados com as mesmas regras do modelo
+(``full_clean``, que inclui ``Activity.clean``) e gravados em lotes: cada lote
+é uma transação com um ``bulk_create``/``bulk_update`` de atividades, uma
+resolução de tags, uma inserção na tabela intermediária e uma de requisitos.
+"""
+import csv
+import json
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from .cache import bump_pages_version
+from .counters import apply_deltas, transition
+from .models import Activity, ActivityRequirement, ActivityTag, normalize_tag_name
+from .search import index_activities
+from .stats import invalidate_dashboard_stats
+
+ACTIVITY_FIELDS = (
+    'title', 'description', 'type', 'status', 'start_date', 'end_date', 'time',
+    'location', 'coordinator', 'participants', 'image_url',
+)
+TAG_MAX_LENGTH = ActivityTag._meta.get_field('name').max_length
+REQUIREMENT_MAX_LENGTH = ActivityRequirement._meta.get_field('requirement').max_length
+UPDATE_FIELDS = [name for name in ACTIVITY_FIELDS if name not in ('title', 'start_date')] + ['updated_at']
+
+
+def read_csv(stream):
+    """Uma linha por atividade; tags separadas por vírgula e requisitos por "|" """
+    for row in csv.DictReader(stream):
+        row['tags'] = as_list(row.get('tags'))
+        row['requirements'] = as_list(row.get('requirements'), separator='|')
+        yield row
+
+
+def read_json(stream):
+    """JSON Lines (um objeto por linha) ou, para arquivos pequenos, uma lista JSON"""
+    first = stream.read(1)
+    while first and first.isspace():
+        first = stream.read(1)
+    if first == '[':
+        # Uma lista JSON precisa ser lida inteira; prefira JSON Lines para arquivos grandes
+        yield from json.loads(first + stream.read())
+        return
+    for line in _prepend(first, stream):
+        if line.strip():
+            yield json.loads(line)
+
+
+def _prepend(first, stream):
+    yield first + stream.readline()
+    yield from stream
+
+
+def as_list(value, separator=','):
+    if isinstance(value, str):
+        value = value.split(separator)
+    return [item.strip() for item in value or [] if item and item.strip()]
+
+
+@dataclass
+class ImportResult:
+    rows: int = 0
+    created: int = 0
+    updated: int = 0
+    errors: list = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+class ActivityImporter:
+    """
+    Importa registros (dicts) de atividades com upsert pela chave natural
+    (título, data de início).
+    """
+
+    def __init__(self, batch_size=500, dry_run=False, progress=None):
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.progress = progress
+
+    def run(self, records):
+        result = ImportResult()
+        started = time.perf_counter()
+        batch = {}
+        for number, record in enumerate(records, start=1):
+            result.rows += 1
+            try:
+                activity, tags, requirements = self.build(record)
+            except ValidationError as exc:
+                result.errors.append((number, exc.message_dict if hasattr(exc, 'error_dict') else exc.messages))
+                continue
+            # Registros repetidos no mesmo lote: vale o último
+            batch[(activity.title, activity.start_date)] = (activity, tags, requirements)
+            if len(batch) >= self.batch_size:
+                self.write_batch(list(batch.values()), result)
+                batch = {}
+                self.report(result, started)
+        if batch:
+            self.write_batch(list(batch.values()), result)
+        result.elapsed = time.perf_counter() - started
+        self.report(result, started)
+        return result
+
+    def report(self, result, started):
+        if self.progress:
+            result.elapsed = time.perf_counter() - started
+            self.progress(result)
+
+    def build(self, record):
+        activity = Activity(**{name: record[name] for name in ACTIVITY_FIELDS if record.get(name) not in (None, '')})
+        activity.full_clean(exclude=['image'], validate_unique=False)
+        tags = list(dict.fromkeys(filter(None, map(normalize_tag_name, as_list(record.get('tags'))))))
+        too_long = [tag for tag in tags if len(tag) > TAG_MAX_LENGTH]
+        if too_long:
+            raise ValidationError({'tags': f'Tags com mais de {TAG_MAX_LENGTH} caracteres: {", ".join(too_long)}'})
+        requirements = as_list(record.get('requirements') or [])
+        if any(len(req) > REQUIREMENT_MAX_LENGTH for req in requirements):
+            raise ValidationError({'requirements': f'Cada requisito deve ter no máximo {REQUIREMENT_MAX_LENGTH} caracteres'})
+        return activity, tags, requirements
+
+    def write_batch(self, batch, result):
+        with transaction.atomic():
+            activity_ids = self._write_activities(batch, result)
+            self._write_tags(batch, activity_ids)
+            self._write_requirements(batch, activity_ids)
+            # bulk_create/bulk_update não disparam signals: atualiza índice, contadores e caches aqui
+            index_activities(activity_ids)
+            if self.dry_run:
+                transaction.set_rollback(True)
+        if not self.dry_run:
+            bump_pages_version()
+            invalidate_dashboard_stats()
+
+    def _write_activities(self, batch, result):
+        activities = [activity for activity, _, _ in batch]
+        existing = {
+            (title, start_date): (pk, (activity_type, status))
+            for pk, title, start_date, activity_type, status in Activity.objects.filter(
+                title__in={a.title for a in activities},
+                start_date__in={a.start_date for a in activities},
+            ).values_list('pk', 'title', 'start_date', 'type', 'status')
+        }
+        now = timezone.now()
+        to_create, to_update = [], []
+        counter_deltas = Counter()
+        for activity in activities:
+            pk, counter_key = existing.get((activity.title, activity.start_date), (None, None))
+            if pk is None:
+                to_create.append(activity)
+            else:
+                activity.pk = pk
+                activity.updated_at = now
+                to_update.append(activity)
+            counter_deltas.update(transition(counter_key, (activity.type, activity.status)))
+
+        Activity.objects.bulk_create(to_create, batch_size=self.batch_size)
+        Activity.objects.bulk_update(to_update, UPDATE_FIELDS, batch_size=self.batch_size)
+        apply_deltas(counter_deltas)
+        result.created += len(to_create)
+        result.updated += len(to_update)
+        return [activity.pk for activity in activities]
+
+    def _write_tags(self, batch, activity_ids):
+        Through = ActivityTag.activities.through
+        Through.objects.filter(activity_id__in=activity_ids).delete()
+        tags = {tag.name: tag.pk for tag in ActivityTag.objects.resolve(
+            name for _, tag_names, _ in batch for name in tag_names
+        )}
+        Through.objects.bulk_create(
+            [
+                Through(activity_id=activity.pk, activitytag_id=tags[name])
+                for activity, tag_names, _ in batch
+                for name in tag_names
+            ],
+            batch_size=self.batch_size,
+        )
+
+    def _write_requirements(self, batch, activity_ids):
+        # _raw_delete não dispara os signals de ActivityRequirement (que tocariam a
+        # atividade uma vez por requisito); updated_at e caches já são tratados aqui
+        requirements = ActivityRequirement.objects.filter(activity_id__in=activity_ids)
+        requirements._raw_delete(requirements.db)
+        ActivityRequirement.objects.bulk_create(
+            [
+                ActivityRequirement(activity_id=activity.pk, requirement=requirement)
+                for activity, _, requirements in batch
+                for requirement in requirements
+            ],
+            batch_size=self.batch_size,
+        )
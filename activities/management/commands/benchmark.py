@@ -0,0 +1,36 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from activities.benchmark import run_benchmark
+
+
+class Command(BaseCommand):
+    help = 'Mede latência (p50/p95), consultas e memória de todas as URLs do app e grava um relatório JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=1)
+        parser.add_argument('--cold-cache', action='store_true', help='Limpa o cache antes de cada requisição')
+        parser.add_argument('--output', default='benchmark.json', help='Arquivo do relatório ("-" para a saída padrão)')
+
+    def handle(self, *args, **options):
+        report = run_benchmark(
+            iterations=options['iterations'],
+            warmup=options['warmup'],
+            cold_cache=options['cold_cache'],
+            progress=self.report_progress if options['output'] != '-' else None,
+        )
+        content = json.dumps(report, indent=2, sort_keys=True, ensure_ascii=False)
+        if options['output'] == '-':
+            self.stdout.write(content)
+        else:
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                handle.write(content + '\n')
+            self.stdout.write(self.style.SUCCESS(f'Relatório gravado em {options["output"]}'))
+
+    def report_progress(self, name, result):
+        self.stdout.write(
+            f'{name:32} {result["status"]}  p50 {result["p50_ms"]:8.2f}ms  p95 {result["p95_ms"]:8.2f}ms  '
+            f'{result["queries"]:3} consultas  {result["peak_memory_kb"]:9.1f} KiB'
+        )
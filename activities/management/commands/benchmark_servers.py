@@ -0,0 +1,120 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+from activities.benchmark import percentile
+from activities.models import Activity
+
+# Servidor, comando e variáveis de ambiente; {port} é trocado pela porta livre
+SERVERS = {
+    'wsgi': (
+        [sys.executable, '-m', 'gunicorn', 'ufc_activities_django.wsgi:application',
+         '--bind', '127.0.0.1:{port}', '--workers', '{workers}', '--threads', '4'],
+        {'ASYNC_VIEWS': ''},
+    ),
+    'asgi': (
+        [sys.executable, '-m', 'uvicorn', 'ufc_activities_django.asgi:application',
+         '--port', '{port}', '--workers', '{workers}', '--no-access-log'],
+        {'ASYNC_VIEWS': '1'},
+    ),
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara o site servido em WSGI (gunicorn, views síncronas) e em ASGI '
+        '(uvicorn, ASYNC_VIEWS=1) sob requisições concorrentes às páginas de leitura'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--server', action='append', dest='servers', choices=sorted(SERVERS))
+        parser.add_argument('--workers', type=int, default=2, help='Processos de cada servidor')
+        parser.add_argument('--concurrency', type=int, default=32, help='Requisições simultâneas')
+        parser.add_argument('--requests', type=int, default=500, help='Requisições por página')
+        parser.add_argument('--output', default='benchmark-servers.json', help='Arquivo do relatório ("-" para a saída padrão)')
+
+    def handle(self, *args, **options):
+        sample = Activity.objects.order_by('pk').values_list('pk', flat=True).first()
+        paths = ['/', '/search/', '/atividades/'] + ([f'/atividades/{sample}/'] if sample else [])
+        report = {}
+        for name in options['servers'] or ['wsgi', 'asgi']:
+            report[name] = self.run_server(name, paths, options)
+        content = json.dumps(report, indent=2, sort_keys=True, ensure_ascii=False)
+        if options['output'] == '-':
+            self.stdout.write(content)
+        else:
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                handle.write(content + '\n')
+            self.stdout.write(self.style.SUCCESS(f'Relatório gravado em {options["output"]}'))
+
+    def run_server(self, name, paths, options):
+        command, env = SERVERS[name]
+        port = free_port()
+        command = [part.format(port=port, workers=options['workers']) for part in command]
+        process = subprocess.Popen(
+            command, env={**os.environ, **env}, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        )
+        try:
+            base = f'http://127.0.0.1:{port}'
+            self.wait_until_ready(process, base + paths[0])
+            results = {}
+            for path in paths:
+                results[path] = result = self.load(base + path, options['concurrency'], options['requests'])
+                if options['output'] != '-':
+                    self.stdout.write(
+                        f'{name} {path:24} {result["rate"]:8.1f} req/s  p50 {result["p50_ms"]:8.2f}ms  '
+                        f'p95 {result["p95_ms"]:8.2f}ms  {result["errors"]} erros'
+                    )
+            return results
+        finally:
+            process.terminate()
+            process.wait(timeout=10)
+
+    def wait_until_ready(self, process, url, timeout=20):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f'O servidor terminou ao iniciar:\n{process.stderr.read().decode()}')
+            try:
+                urllib.request.urlopen(url, timeout=1).read()
+                return
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.2)
+        raise CommandError(f'O servidor não respondeu em {timeout}s')
+
+    def load(self, url, concurrency, requests):
+        def fetch(_):
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(url, timeout=30) as response:
+                    response.read()
+                ok = True
+            except (urllib.error.URLError, ConnectionError):
+                ok = False
+            return ok, time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as executor:
+            outcomes = list(executor.map(fetch, range(requests)))
+        elapsed = time.perf_counter() - started
+        timings = sorted(duration * 1000 for ok, duration in outcomes if ok)
+        return {
+            'rate': len(timings) / elapsed,
+            'p50_ms': percentile(timings, 50) if timings else 0.0,
+            'p95_ms': percentile(timings, 95) if timings else 0.0,
+            'errors': requests - len(timings),
+        }
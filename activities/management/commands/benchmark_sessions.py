@@ -0,0 +1,74 @@
+import threading
+import time
+from importlib import import_module
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara backends de sessão sob concorrência: várias threads carregam a '
+        'sessão a cada "requisição" e a alteram em parte delas, como o site faz'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--engine', action='append', dest='engines',
+            help='Backend de sessão (padrão: db e cached_db); pode ser repetido',
+        )
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--requests', type=int, default=200, help='Requisições por thread')
+        parser.add_argument('--write-every', type=int, default=10, help='Uma escrita a cada N requisições')
+
+    def handle(self, *args, **options):
+        engines = options['engines'] or [
+            'django.contrib.sessions.backends.db',
+            'django.contrib.sessions.backends.cached_db',
+        ]
+        for engine in engines:
+            result = self.run_engine(engine, options['threads'], options['requests'], options['write_every'])
+            self.stdout.write(
+                f'{engine}: {result["rate"]:.0f} req/s, {result["queries"]} consultas ao banco, '
+                f'{result["locked"]} erros "database is locked"'
+            )
+
+    def run_engine(self, engine, threads, requests, write_every):
+        SessionStore = import_module(engine).SessionStore
+        counters = {'queries': 0, 'locked': 0}
+        lock = threading.Lock()
+
+        def count_query(execute, sql, params, many, context):
+            with lock:
+                counters['queries'] += 1
+            return execute(sql, params, many, context)
+
+        def worker():
+            session = SessionStore()
+            session['visits'] = 0
+            session.create()
+            key = session.session_key
+            try:
+                with connection.execute_wrapper(count_query):
+                    for number in range(requests):
+                        session = SessionStore(session_key=key)
+                        try:
+                            visits = session.get('visits', 0)
+                            if number % write_every == 0:
+                                session['visits'] = visits + 1
+                                session.save()
+                        except OperationalError:
+                            with lock:
+                                counters['locked'] += 1
+                SessionStore(session_key=key).delete()
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        started = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        return {'rate': threads * requests / elapsed, **counters}
@@ -0,0 +1,36 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from activities.templating import benchmark_templates, measure_warmup, project_template_names
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede a renderização fria (sem cache de templates) e quente (loader em cache) '
+        'de cada template do projeto e o tempo de pré-compilação na subida do worker'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--template', action='append', dest='templates', help='Só este template; pode ser repetido')
+        parser.add_argument('--output', default='-', help='Arquivo do relatório JSON ("-" para a saída padrão)')
+
+    def handle(self, *args, **options):
+        names = options['templates'] or project_template_names()
+        results = benchmark_templates(iterations=options['iterations'], names=names)
+        for name, result in results.items():
+            if 'error' in result:
+                self.stdout.write(self.style.WARNING(f'{name:48} {result["error"]}'))
+            else:
+                self.stdout.write(
+                    f'{name:48} fria {result["cold_ms"]:8.3f}ms  quente {result["warm_ms"]:8.3f}ms  '
+                    f'{result["speedup"]:6.1f}x'
+                )
+        warmed, warmup_ms = measure_warmup()
+        self.stdout.write(f'Pré-compilação na subida do worker: {warmed} templates em {warmup_ms:.1f}ms')
+        if options['output'] != '-':
+            report = {'templates': results, 'warmup': {'templates': warmed, 'ms': warmup_ms}}
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                handle.write(json.dumps(report, indent=2, sort_keys=True, ensure_ascii=False) + '\n')
+            self.stdout.write(self.style.SUCCESS(f'Relatório gravado em {options["output"]}'))
@@ -0,0 +1,98 @@
+import itertools
+import re
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count, IntegerField, Max, Value
+from django.test import RequestFactory
+
+from activities.facets import facets_query, queried_facets
+from activities.filters import filter_activities
+from activities.models import Activity
+from activities.views import ActivityListView, search_paginator
+
+# Valores usados para montar todas as combinações de filtros das views
+FILTER_VALUES = {
+    'search': [None, 'django'],
+    'type': [None, 'COURSE'],
+    'status': [None, 'PENDING', 'UPCOMING'],
+    'tag': [None, 'python'],
+    'month': [None, '2025-03'],
+    'start_date': [None, date(2025, 1, 1).isoformat()],
+    'end_date': [None, date(2025, 12, 31).isoformat()],
+}
+
+# Varredura completa da tabela de atividades. No SQLite são aceitas apenas as
+# varreduras que leem só o índice (COVERING INDEX) e a varredura em ordem de
+# created_at, que para logo ao preencher o LIMIT da página.
+FULL_SCAN_PATTERNS = {
+    'sqlite': re.compile(
+        rf'SCAN {Activity._meta.db_table}\b'
+        r'(?! USING COVERING INDEX)(?! USING INDEX activity_created_id_idx\b)'
+    ),
+    'postgresql': re.compile(rf'Seq Scan on {Activity._meta.db_table}\b'),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Roda EXPLAIN nas consultas da lista, da busca, das facetas e dos validadores '
+        'de cache para todas as combinações de filtros e falha se alguma delas fizer '
+        'varredura completa da tabela'
+    )
+
+    def handle(self, *args, **options):
+        pattern = FULL_SCAN_PATTERNS.get(connection.vendor)
+        if pattern is None:
+            raise CommandError(f'Banco "{connection.vendor}" não suportado')
+        if connection.vendor == 'postgresql':
+            # Em tabelas pequenas o PostgreSQL prefere Seq Scan mesmo com índice;
+            # desligar a opção mostra se existe um caminho por índice
+            with connection.cursor() as cursor:
+                cursor.execute('SET enable_seqscan = off')
+
+        regressions = []
+        checked = 0
+        for params in self.filter_combinations():
+            for name, queryset in self.view_querysets(params):
+                plan = queryset.explain()
+                checked += 1
+                if pattern.search(plan):
+                    regressions.append((name, params, plan))
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'{name} {params}\n{plan}\n')
+
+        for name, params, plan in regressions:
+            self.stderr.write(f'{name} {params}:\n{plan}\n')
+        if regressions:
+            raise CommandError(f'{len(regressions)} de {checked} consultas fazem varredura completa da tabela')
+        self.stdout.write(self.style.SUCCESS(f'{checked} consultas verificadas, nenhuma varredura completa'))
+
+    def filter_combinations(self):
+        keys = list(FILTER_VALUES)
+        for values in itertools.product(*FILTER_VALUES.values()):
+            yield {key: value for key, value in zip(keys, values) if value is not None}
+
+    def view_querysets(self, params):
+        request = RequestFactory().get('/', params)
+
+        view = ActivityListView()
+        view.setup(request)
+        queryset = view.get_queryset()
+        yield 'activity_list (página)', queryset[:view.paginate_by]
+        yield 'activity_list (contagem)', queryset.order_by().values('pk')
+
+        paginator = search_paginator(request.GET)
+        yield 'search', paginator.queryset.order_by(*paginator.ordering)[:paginator.per_page + 1]
+
+        yield 'facetas', facets_query(queried_facets(request.GET))
+
+        # Mesma consulta do aggregate() de activity_list_validators (aggregate não tem explain()):
+        # agrupar por uma constante não gera GROUP BY
+        queryset = filter_activities(Activity.objects.order_by(), request.GET)
+        yield 'activity_list (validadores)', (
+            queryset.annotate(row=Value(1, output_field=IntegerField())).values('row')
+            .annotate(last_modified=Max('updated_at'), count=Count('pk'))
+            .values('last_modified', 'count')
+        )
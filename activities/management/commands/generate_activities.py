@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from activities.importers import ActivityImporter
+from activities.synthetic import generate_records
+
+
+class Command(BaseCommand):
+    help = 'Gera atividades sintéticas (com tags e requisitos) para testes de carga'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=1000)
+        parser.add_argument('--tags-per-activity', type=int, default=3)
+        parser.add_argument('--requirements-per-activity', type=int, default=2)
+        parser.add_argument('--tag-pool', type=int, default=200, help='Quantidade de tags distintas')
+        parser.add_argument('--seed', type=int, help='Semente para gerar sempre os mesmos dados')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        records = generate_records(
+            options['count'],
+            tags_per_activity=options['tags_per_activity'],
+            requirements_per_activity=options['requirements_per_activity'],
+            tag_pool=options['tag_pool'],
+            seed=options['seed'],
+        )
+        result = ActivityImporter(batch_size=options['batch_size']).run(records)
+        self.stdout.write(self.style.SUCCESS(
+            f'{result.created} atividades criadas, {result.updated} atualizadas '
+            f'em {result.elapsed:.2f}s ({result.rows_per_second:.0f}/s)'
+        ))
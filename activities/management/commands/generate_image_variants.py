@@ -0,0 +1,49 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from activities.images import generate_variants, variants_are_stale
+from activities.models import Activity
+
+
+class Command(BaseCommand):
+    help = 'Gera as variações redimensionadas (card, detalhe, 2x) das imagens já enviadas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Regera mesmo as variações em dia')
+        parser.add_argument('--workers', type=int, default=4, help='0 processa tudo na thread principal')
+
+    def handle(self, *args, **options):
+        activities = Activity.objects.exclude(image='').exclude(image__isnull=True).only('image', 'image_variants')
+        pending = [
+            activity.pk for activity in activities.iterator()
+            if options['force'] or variants_are_stale(activity)
+        ]
+
+        def process(activity_id):
+            try:
+                return generate_variants(activity_id)
+            finally:
+                close_old_connections()
+
+        failures = 0
+        if options['workers'] > 0:
+            executor = ThreadPoolExecutor(max_workers=options['workers'])
+            results = {activity_id: executor.submit(process, activity_id).result for activity_id in pending}
+        else:
+            executor = None
+            results = {activity_id: partial(generate_variants, activity_id) for activity_id in pending}
+        for activity_id, result in results.items():
+            try:
+                result()
+            except Exception as exc:
+                failures += 1
+                self.stderr.write(f'Atividade {activity_id}: {exc}')
+        if executor:
+            executor.shutdown()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(pending) - failures} imagens processadas, {failures} com erro'
+        ))
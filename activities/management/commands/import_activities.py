@@ -0,0 +1,58 @@
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from activities.importers import ActivityImporter, read_csv, read_json
+
+READERS = {'csv': read_csv, 'json': read_json, 'jsonl': read_json}
+
+
+class Command(BaseCommand):
+    help = (
+        'Importa atividades de um arquivo CSV ou JSON (JSON Lines ou lista), em lotes. '
+        'Atividades com o mesmo título e data de início são atualizadas.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Arquivo a importar ("-" para a entrada padrão)')
+        parser.add_argument('--format', choices=sorted(READERS), help='Padrão: extensão do arquivo')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true', help='Valida e grava, mas desfaz cada lote')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or Path(path).suffix.lstrip('.').lower()
+        if file_format not in READERS:
+            raise CommandError('Informe --format csv ou json')
+
+        importer = ActivityImporter(
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run'],
+            progress=self.report_progress if options['verbosity'] > 1 else None,
+        )
+        stream = sys.stdin if path == '-' else self.open(path)
+        try:
+            result = importer.run(READERS[file_format](stream))
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        for number, errors in result.errors:
+            self.stderr.write(f'Registro {number}: {errors}')
+        prefix = '[dry-run] ' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefix}{result.rows} registros em {result.elapsed:.2f}s '
+            f'({result.rows_per_second:.0f}/s): {result.created} criadas, '
+            f'{result.updated} atualizadas, {len(result.errors)} com erro'
+        ))
+
+    def open(self, path):
+        try:
+            # utf-8-sig aceita arquivos exportados pelo Excel (com BOM)
+            return open(path, encoding='utf-8-sig', newline='')
+        except OSError as exc:
+            raise CommandError(exc)
+
+    def report_progress(self, result):
+        self.stdout.write(f'  {result.rows} registros ({result.rows_per_second:.0f}/s)')
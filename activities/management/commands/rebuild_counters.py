@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from activities.cache import bump_pages_version
+from activities.counters import rebuild_counters
+from activities.stats import invalidate_dashboard_stats
+
+
+class Command(BaseCommand):
+    help = 'Recalcula os contadores de atividades por tipo e status e mostra as divergências corrigidas'
+
+    def handle(self, *args, **options):
+        changes = rebuild_counters()
+        for (activity_type, status), (before, after) in sorted(changes.items()):
+            self.stdout.write(f'{activity_type}/{status}: {before} -> {after}')
+        if changes:
+            invalidate_dashboard_stats()
+            bump_pages_version()
+            self.stdout.write(self.style.WARNING(f'{len(changes)} contadores corrigidos'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Contadores em dia'))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from activities.search import get_backend
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói o índice de busca textual das atividades'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help='Banco de dados a reindexar')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        backend = get_backend(options['database'])
+        with transaction.atomic(using=options['database']):
+            total = backend.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'{total} atividades indexadas'))
@@ -0,0 +1,125 @@
+import random
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections, transaction
+
+STRESS_ALIAS = 'stress'
+
+
+class Command(BaseCommand):
+    help = (
+        'Teste de concorrência do SQLite: leitores e escritores simultâneos num banco '
+        'temporário criado com as mesmas opções de DATABASES["default"]'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--duration', type=float, default=3.0, help='Segundos de teste')
+        parser.add_argument('--hold', type=float, default=0.01, help='Segundos que cada escrita mantém a transação aberta')
+        parser.add_argument(
+            '--compare', action='store_true',
+            help='Roda também com as opções padrão do SQLite (journal DELETE, sem timeout longo)',
+        )
+
+    def handle(self, *args, **options):
+        settings_dict = connections['default'].settings_dict
+        if connections['default'].vendor != 'sqlite':
+            raise CommandError('Este teste só se aplica ao SQLite')
+
+        profiles = [('configurado', settings_dict)]
+        if options['compare']:
+            profiles.append(('padrão', {**settings_dict, 'OPTIONS': {}}))
+
+        for name, profile in profiles:
+            result = self.run_profile(profile, options)
+            self.stdout.write(
+                f'{name}: {result["reads"]} leituras (p95 {result["read_p95_ms"]:.1f}ms, '
+                f'máx {result["read_max_ms"]:.1f}ms), {result["writes"]} escritas, '
+                f'{result["errors"]} erros "database is locked"'
+            )
+
+    def run_profile(self, settings_dict, options):
+        with tempfile.TemporaryDirectory() as directory:
+            settings_dict = {**settings_dict, 'NAME': str(Path(directory) / 'stress.sqlite3')}
+            self.setup_database(settings_dict)
+            return self.run_threads(settings_dict, options)
+
+    def connect(self, settings_dict):
+        """Nova conexão (no thread atual) com as opções do settings, inclusive init_command"""
+        wrapper = connections['default'].__class__(settings_dict, alias=STRESS_ALIAS)
+        connections[STRESS_ALIAS] = wrapper
+        return wrapper
+
+    def disconnect(self, wrapper):
+        wrapper.close()
+        del connections[STRESS_ALIAS]
+
+    def setup_database(self, settings_dict):
+        wrapper = self.connect(settings_dict)
+        with wrapper.cursor() as cursor:
+            cursor.execute('CREATE TABLE stress (id INTEGER PRIMARY KEY, value INTEGER NOT NULL)')
+            cursor.executemany('INSERT INTO stress (value) VALUES (%s)', [(0,)] * 1000)
+        self.disconnect(wrapper)
+
+    def run_threads(self, settings_dict, options):
+        deadline = time.monotonic() + options['duration']
+        latencies, counters = [], {'writes': 0, 'errors': 0}
+        lock = threading.Lock()
+
+        def reader():
+            wrapper = self.connect(settings_dict)
+            try:
+                while time.monotonic() < deadline:
+                    started = time.perf_counter()
+                    try:
+                        with wrapper.cursor() as cursor:
+                            cursor.execute('SELECT COUNT(*), SUM(value) FROM stress')
+                            cursor.fetchone()
+                    except OperationalError:
+                        with lock:
+                            counters['errors'] += 1
+                        continue
+                    with lock:
+                        latencies.append((time.perf_counter() - started) * 1000)
+            finally:
+                self.disconnect(wrapper)
+
+        def writer():
+            wrapper = self.connect(settings_dict)
+            try:
+                while time.monotonic() < deadline:
+                    try:
+                        with transaction.atomic(using=STRESS_ALIAS):
+                            with wrapper.cursor() as cursor:
+                                cursor.execute(
+                                    'UPDATE stress SET value = value + 1 WHERE id = %s', [random.randint(1, 1000)]
+                                )
+                            time.sleep(options['hold'])
+                    except OperationalError:
+                        with lock:
+                            counters['errors'] += 1
+                        continue
+                    with lock:
+                        counters['writes'] += 1
+            finally:
+                self.disconnect(wrapper)
+
+        threads = [threading.Thread(target=reader) for _ in range(options['readers'])]
+        threads += [threading.Thread(target=writer) for _ in range(options['writers'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return {
+            'reads': len(latencies),
+            'read_p95_ms': statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else 0.0,
+            'read_max_ms': max(latencies, default=0.0),
+            **counters,
+        }
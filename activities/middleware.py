@@ -1,27 +1,281 @@
-class AccessibilityMiddleware:
+import json
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.utils.cache import patch_vary_headers
+
+from . import routers
+
+logger = logging.getLogger(__name__)
+
+ACCESSIBILITY_PARAMS = ('font_size', 'contrast', 'dyslexia')
+ACCESSIBILITY_DEFAULTS = {'font_size': 'normal', 'contrast': 'normal', 'dyslexia': False}
+FONT_SIZES = ('normal', 'large', 'larger')
+CONTRASTS = ('normal', 'high')
+
+ACCESSIBILITY_COOKIE = 'a11y'
+ACCESSIBILITY_COOKIE_SALT = 'activities.accessibility'
+ACCESSIBILITY_COOKIE_MAX_AGE = 365 * 24 * 60 * 60
+
+REPLICA_PIN_COOKIE = 'pin_primary'
+
+
+def decode_preferences(value):
+    """Lê o valor do cookie ("large|high|1"), ignorando partes inválidas"""
+    preferences = dict(ACCESSIBILITY_DEFAULTS)
+    font_size, contrast, dyslexia = (value.split('|') + ['', '', ''])[:3]
+    if font_size in FONT_SIZES:
+        preferences['font_size'] = font_size
+    if contrast in CONTRASTS:
+        preferences['contrast'] = contrast
+    preferences['dyslexia'] = dyslexia == '1'
+    return preferences
+
+
+def encode_preferences(preferences):
+    return '|'.join([preferences['font_size'], preferences['contrast'], '1' if preferences['dyslexia'] else '0'])
+
+
+def get_accessibility_preferences(request):
+    """Preferências de acessibilidade do visitante, com os valores padrão"""
+    if not hasattr(request, '_accessibility'):
+        value = request.get_signed_cookie(ACCESSIBILITY_COOKIE, default='', salt=ACCESSIBILITY_COOKIE_SALT)
+        request._accessibility = decode_preferences(value)
+    return request._accessibility
+
+
+class HybridMiddleware:
     """
-    Middleware para gerenciar preferências de acessibilidade via sessão.
-    Processa parâmetros GET: font_size, contrast, dyslexia
+    Base dos middlewares do app: funcionam em WSGI e em ASGI. Em ASGI o
+    Django chama __acall__ direto no event loop, sem passar por uma thread.
     """
-    
+
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+
+class AccessibilityMiddleware(HybridMiddleware):
+    """
+    Middleware para gerenciar preferências de acessibilidade via cookie assinado.
+    Processa parâmetros GET: font_size, contrast, dyslexia
+
+    As preferências ficam num único cookie, gravado só quando mudam; assim as
+    páginas não precisam carregar (nem salvar) a sessão para aplicá-las.
+    """
     
     def __call__(self, request):
-        # Processar parâmetros de acessibilidade da URL e salvar na sessão
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        current = self.apply_preferences(request)
+        return self.save_preferences(request, current, self.get_response(request))
+
+    async def __acall__(self, request):
+        current = self.apply_preferences(request)
+        return self.save_preferences(request, current, await self.get_response(request))
+
+    def apply_preferences(self, request):
+        """Aplica os parâmetros da URL à requisição; devolve as preferências anteriores"""
+        current = get_accessibility_preferences(request)
+        preferences = dict(current)
+
         if 'font_size' in request.GET:
             font_size = request.GET.get('font_size')
-            if font_size in ('normal', 'large', 'larger'):
-                request.session['font_size'] = font_size
+            if font_size in FONT_SIZES:
+                preferences['font_size'] = font_size
         
         if 'contrast' in request.GET:
             contrast = request.GET.get('contrast')
-            if contrast in ('normal', 'high'):
-                request.session['contrast'] = contrast
+            if contrast in CONTRASTS:
+                preferences['contrast'] = contrast
         
         if 'dyslexia' in request.GET:
             dyslexia = request.GET.get('dyslexia')
-            request.session['dyslexia'] = dyslexia == 'true'
-        
-        response = self.get_response(request)
+            preferences['dyslexia'] = dyslexia == 'true'
+
+        request._accessibility = preferences
+        return current
+
+    def save_preferences(self, request, current, response):
+        preferences = request._accessibility
+        if preferences != current:
+            if preferences == ACCESSIBILITY_DEFAULTS:
+                response.delete_cookie(ACCESSIBILITY_COOKIE)
+            else:
+                response.set_signed_cookie(
+                    ACCESSIBILITY_COOKIE, encode_preferences(preferences), salt=ACCESSIBILITY_COOKIE_SALT,
+                    max_age=ACCESSIBILITY_COOKIE_MAX_AGE, httponly=True, samesite='Lax',
+                )
+        # O HTML muda conforme o cookie
+        patch_vary_headers(response, ('Cookie',))
+        return response
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.view_started = None
+        self.view_time = 0.0
+        self.template_time = 0.0
+
+    def record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - started
+
+
+class InstrumentationMiddleware(HybridMiddleware):
+    """
+    Mede cada requisição: consultas ao banco e o tempo gasto nelas, tempo da
+    view e da renderização do template (para TemplateResponse), agrupados pelo
+    nome da URL. Os números saem no cabeçalho Server-Timing e numa linha de log
+    em JSON, e são comparados com o orçamento de consultas de QUERY_BUDGETS.
+
+    Deve ser o primeiro da lista MIDDLEWARE para contar também as consultas de
+    sessão e autenticação. Consultas feitas durante o envio de uma resposta em
+    streaming não são contadas.
+    """
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = request._metrics = RequestMetrics()
+        started = time.perf_counter()
+        self.install(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            self.uninstall(metrics)
+        return self.finish(request, response, started)
+
+    async def __acall__(self, request):
+        metrics = request._metrics = RequestMetrics()
+        started = time.perf_counter()
+        # O ORM assíncrono executa as consultas na thread "sensível" da requisição,
+        # então o wrapper precisa ser instalado nas conexões daquela thread
+        await sync_to_async(self.install)(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(self.uninstall)(metrics)
+        return self.finish(request, response, started)
+
+    def install(self, metrics):
+        for alias in connections:
+            connections[alias].execute_wrappers.append(metrics.record_query)
+
+    def uninstall(self, metrics):
+        for alias in connections:
+            wrappers = connections[alias].execute_wrappers
+            if metrics.record_query in wrappers:
+                wrappers.remove(metrics.record_query)
+
+    def finish(self, request, response, started):
+        metrics = request._metrics
+        finished = time.perf_counter()
+        total = finished - started
+        if metrics.view_started is not None and not metrics.view_time:
+            # Respostas que não são TemplateResponse: a view já devolve tudo pronto
+            metrics.view_time = finished - metrics.view_started
+
+        match = request.resolver_match
+        url_name = match.view_name if match else None
+        response['Server-Timing'] = ', '.join([
+            f'db;desc="{metrics.queries} consultas";dur={metrics.db_time * 1000:.1f}',
+            f'view;dur={metrics.view_time * 1000:.1f}',
+            f'tpl;dur={metrics.template_time * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ])
+        logger.info(json.dumps({
+            'url_name': url_name,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': metrics.queries,
+            'db_ms': round(metrics.db_time * 1000, 2),
+            'view_ms': round(metrics.view_time * 1000, 2),
+            'template_ms': round(metrics.template_time * 1000, 2),
+            'total_ms': round(total * 1000, 2),
+        }))
+        self.check_query_budget(url_name, metrics.queries)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._metrics.view_started = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        # Como primeiro middleware, este é o último hook antes do render()
+        metrics = request._metrics
+        started = time.perf_counter()
+        metrics.view_time = started - metrics.view_started
+
+        def rendered(response):
+            metrics.template_time = time.perf_counter() - started
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    def check_query_budget(self, url_name, queries):
+        budget = getattr(settings, 'QUERY_BUDGETS', {}).get(url_name)
+        if budget is None or queries <= budget:
+            return
+        message = f'{url_name} fez {queries} consultas (orçamento: {budget})'
+        if getattr(settings, 'QUERY_BUDGET_ACTION', 'log') == 'raise':
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+class ReplicaRoutingMiddleware(HybridMiddleware):
+    """
+    Envia as leituras das views de REPLICA_READ_VIEWS (GET/HEAD) para uma
+    réplica, inclusive as feitas durante a renderização do template. Depois de
+    uma requisição que grava no banco, fixa o visitante no banco principal por
+    REPLICA_PIN_SECONDS, para que ele veja o que acabou de criar ou editar.
+    """
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        routing, token = routers.start_request(pinned=REPLICA_PIN_COOKIE in request.COOKIES)
+        try:
+            response = self.get_response(request)
+        finally:
+            routers.finish_request(token)
+        return self.pin_after_write(routing, response)
+
+    async def __acall__(self, request):
+        routing, token = routers.start_request(pinned=REPLICA_PIN_COOKIE in request.COOKIES)
+        try:
+            response = await self.get_response(request)
+        finally:
+            routers.finish_request(token)
+        return self.pin_after_write(routing, response)
+
+    def pin_after_write(self, routing, response):
+        if routing.wrote:
+            response.set_cookie(
+                REPLICA_PIN_COOKIE, '1', max_age=getattr(settings, 'REPLICA_PIN_SECONDS', 10),
+                httponly=True, samesite='Lax',
+            )
         return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method in ('GET', 'HEAD') and request.resolver_match.view_name in getattr(
+            settings, 'REPLICA_READ_VIEWS', ()
+        ):
+            routers.use_replica()
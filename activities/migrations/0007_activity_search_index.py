@@ -0,0 +1,74 @@
+import unicodedata
+
+from django.db import migrations
+
+FIELDS = ('title', 'description', 'coordinator', 'location', 'tags')
+
+
+def normalize(text):
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def create_search_index(apps, schema_editor):
+    """Cria a tabela de busca textual e indexa as atividades existentes"""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            'CREATE VIRTUAL TABLE activities_activity_fts USING fts5('
+            'title, description, coordinator, location, tags, '
+            "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        )
+        insert = (
+            'INSERT INTO activities_activity_fts (rowid, title, description, coordinator, location, tags) '
+            'VALUES (%s, %s, %s, %s, %s, %s)'
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE TABLE activities_activity_search ('
+            'activity_id bigint PRIMARY KEY REFERENCES activities_activity (id) '
+            'ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, '
+            'document tsvector NOT NULL)'
+        )
+        schema_editor.execute(
+            'CREATE INDEX activities_activity_search_document_idx '
+            'ON activities_activity_search USING GIN (document)'
+        )
+        weights = ('A', 'D', 'C', 'C', 'B')
+        document = ' || '.join(f"setweight(to_tsvector('portuguese', %s), '{w}')" for w in weights)
+        insert = f'INSERT INTO activities_activity_search (activity_id, document) VALUES (%s, {document})'
+    else:
+        return
+
+    Activity = apps.get_model('activities', 'Activity')
+    ActivityTag = apps.get_model('activities', 'ActivityTag')
+    tags = {}
+    through = ActivityTag.activities.through.objects.values_list('activity_id', 'activitytag__name')
+    for activity_id, name in through:
+        tags.setdefault(activity_id, []).append(name)
+
+    rows = []
+    for activity in Activity.objects.values('pk', *FIELDS[:-1]).iterator():
+        activity['tags'] = ' '.join(tags.get(activity['pk'], []))
+        rows.append((activity['pk'], *(normalize(activity[field]) for field in FIELDS)))
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(insert, rows)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS activities_activity_fts')
+    elif vendor == 'postgresql':
+        schema_editor.execute('DROP TABLE IF EXISTS activities_activity_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0006_activity_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,40 @@
+from django.db import migrations
+
+
+def normalize(name):
+    return ' '.join(name.split()).lower()
+
+
+def merge_duplicate_tags(apps, schema_editor):
+    """Normaliza os nomes das tags e junta as que ficam iguais ("Python" e "python ")"""
+    ActivityTag = apps.get_model('activities', 'ActivityTag')
+    Through = ActivityTag.activities.through
+
+    groups = {}
+    for tag in ActivityTag.objects.order_by('pk'):
+        groups.setdefault(normalize(tag.name), []).append(tag)
+
+    for name, (keep, *duplicates) in groups.items():
+        if duplicates:
+            duplicate_ids = [tag.pk for tag in duplicates]
+            activity_ids = set(
+                Through.objects.filter(activitytag_id__in=duplicate_ids).values_list('activity_id', flat=True)
+            )
+            activity_ids -= set(Through.objects.filter(activitytag_id=keep.pk).values_list('activity_id', flat=True))
+            Through.objects.bulk_create([
+                Through(activitytag_id=keep.pk, activity_id=activity_id) for activity_id in activity_ids
+            ])
+            ActivityTag.objects.filter(pk__in=duplicate_ids).delete()
+        if keep.name != name:
+            ActivityTag.objects.filter(pk=keep.pk).update(name=name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0008_activity_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_tags, migrations.RunPython.noop),
+    ]
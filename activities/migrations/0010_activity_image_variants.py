@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0009_normalize_tag_names'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activity',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Variações da imagem'),
+        ),
+    ]
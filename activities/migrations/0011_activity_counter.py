@@ -0,0 +1,35 @@
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_counters(apps, schema_editor):
+    """Conta as atividades já existentes por tipo e status"""
+    Activity = apps.get_model('activities', 'Activity')
+    ActivityCounter = apps.get_model('activities', 'ActivityCounter')
+    rows = Activity.objects.order_by().values('type', 'status').annotate(count=Count('pk'))
+    ActivityCounter.objects.bulk_create([ActivityCounter(**row) for row in rows])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0010_activity_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type', models.CharField(choices=[('COURSE', 'Curso'), ('WORKSHOP', 'Workshop'), ('SEMINAR', 'Seminário'), ('RESEARCH', 'Pesquisa'), ('EXTENSION', 'Extensão'), ('OTHER', 'Outro')], max_length=20, verbose_name='Tipo')),
+                ('status', models.CharField(choices=[('PENDING', 'Pendente'), ('UPCOMING', 'Pendente'), ('IN_PROGRESS', 'Em Andamento'), ('ACTIVE', 'Em Andamento'), ('COMPLETED', 'Concluída'), ('CANCELLED', 'Cancelada')], max_length=20, verbose_name='Status')),
+                ('count', models.IntegerField(default=0, verbose_name='Quantidade')),
+            ],
+            options={
+                'verbose_name': 'Contador de atividades',
+                'verbose_name_plural': 'Contadores de atividades',
+                'constraints': [models.UniqueConstraint(fields=('type', 'status'), name='activity_counter_type_status_uniq')],
+            },
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,25 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.urls import reverse
+from django.utils import timezone
 from django.core.validators import MinValueValidator, MinLengthValidator
+from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 
 
+class ActivityQuerySet(models.QuerySet):
+    def with_tags(self):
+        """Carrega as tags de todas as atividades em uma única consulta extra"""
+        return self.prefetch_related('tags')
+
+    def touch(self):
+        """Atualiza updated_at sem disparar signals (ex.: quando só as tags mudaram)"""
+        return self.update(updated_at=timezone.now())
+
+
 class Activity(models.Model):
+    TAG_PREVIEW_LIMIT = 3
+
     class ActivityType(models.TextChoices):
         COURSE = 'COURSE', _('Curso')
         WORKSHOP = 'WORKSHOP', _('Workshop')
@@ -87,6 +101,8 @@ class Activity(models.Model):
         default=1
     )
     image = models.ImageField('Imagem', upload_to='activities/', blank=True, null=True)
+    # Versões redimensionadas de ``image`` (ver activities/images.py)
+    image_variants = models.JSONField('Variações da imagem', default=dict, blank=True, editable=False)
     image_url = models.URLField(
         null=True,
         blank=True,
@@ -101,10 +117,23 @@ class Activity(models.Model):
         verbose_name=_('Atualizado em')
     )
     
+    objects = ActivityQuerySet.as_manager()
+
     class Meta:
         verbose_name = _('Atividade')
         verbose_name_plural = _('Atividades')
         ordering = ['-start_date']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='activity_created_id_idx'),
+            models.Index(fields=['status', '-created_at', '-id'], name='activity_status_created_idx'),
+            models.Index(fields=['type', '-created_at', '-id'], name='activity_type_created_idx'),
+            models.Index(fields=['start_date'], name='activity_start_date_idx'),
+            # Facetas de tipo e status: contam só pelo índice, já agrupado, com os outros filtros
+            models.Index(fields=['type', 'status', 'start_date'], name='activity_type_status_idx'),
+            models.Index(fields=['status', 'type', 'start_date'], name='activity_status_type_idx'),
+            # Validadores da listagem (MAX(updated_at) e COUNT sem ler a tabela)
+            models.Index(fields=['updated_at'], name='activity_updated_at_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -143,10 +172,53 @@ class Activity(models.Model):
         }
         return icons.get(self.type, '📌')
 
+    @cached_property
+    def tag_list(self):
+        """Tags da atividade (usa o cache do prefetch_related quando disponível)"""
+        return list(self.tags.all())
+
+    @property
+    def tag_count(self):
+        return len(self.tag_list)
+
+    @property
+    def preview_tags(self):
+        """Primeiras tags exibidas nos cards"""
+        return self.tag_list[:self.TAG_PREVIEW_LIMIT]
+
+    @property
+    def hidden_tag_count(self):
+        """Quantidade de tags que não aparecem no card"""
+        return max(self.tag_count - self.TAG_PREVIEW_LIMIT, 0)
+
+
+def normalize_tag_name(name):
+    """Normaliza o nome da tag para evitar duplicatas ("  Machine  Learning" -> "machine learning")"""
+    return ' '.join(name.split()).lower()
+
+
+class ActivityTagManager(models.Manager):
+    def resolve(self, names):
+        """
+        Devolve as tags com os nomes informados (normalizados e sem repetição),
+        criando as que faltam. Usa no máximo três consultas, qualquer que seja
+        a quantidade de tags.
+        """
+        normalized = list(dict.fromkeys(filter(None, map(normalize_tag_name, names))))
+        tags = {tag.name: tag for tag in self.filter(name__in=normalized)}
+        missing = [name for name in normalized if name not in tags]
+        if missing:
+            # ignore_conflicts: outra requisição pode ter criado a mesma tag agora
+            self.bulk_create([self.model(name=name) for name in missing], ignore_conflicts=True)
+            tags.update((tag.name, tag) for tag in self.filter(name__in=missing))
+        return [tags[name] for name in normalized]
+
 
 class ActivityTag(models.Model):
     name = models.CharField('Nome', max_length=50, unique=True)
     activities = models.ManyToManyField(Activity, related_name='tags', blank=True)
+
+    objects = ActivityTagManager()
     
     class Meta:
         verbose_name = 'Tag'
@@ -167,3 +239,24 @@ class ActivityRequirement(models.Model):
     
     def __str__(self):
         return f"{self.activity.title} - {self.requirement}"
+
+
+class ActivityCounter(models.Model):
+    """
+    Quantidade de atividades por tipo e status, mantida pelos signals e pelo
+    importador (ver activities/counters.py). Se divergir das atividades,
+    reconstrua com ``manage.py rebuild_counters``.
+    """
+    type = models.CharField('Tipo', max_length=20, choices=Activity.ActivityType.choices)
+    status = models.CharField('Status', max_length=20, choices=Activity.ActivityStatus.choices)
+    count = models.IntegerField('Quantidade', default=0)
+
+    class Meta:
+        verbose_name = 'Contador de atividades'
+        verbose_name_plural = 'Contadores de atividades'
+        constraints = [
+            models.UniqueConstraint(fields=['type', 'status'], name='activity_counter_type_status_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.type}/{self.status}: {self.count}'
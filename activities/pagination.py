@@ -0,0 +1,140 @@
+from datetime import datetime
+
+from django.core import signing
+from django.db.models import Q
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Paginação por cursor sobre (created_at, id), do mais recente para o mais antigo.
+
+    Ao contrário do Paginator do Django, não usa OFFSET nem COUNT(*): cada página
+    é uma busca por intervalo no índice, então o custo não cresce com a
+    profundidade da página nem com o tamanho da tabela. Os cursores são
+    assinados, para que o cliente não consiga forjar posições arbitrárias.
+    """
+
+    salt = 'activities.pagination.cursor'
+    key = 'created_at'
+    ordering = ('-created_at', '-pk')
+
+    def __init__(self, queryset, per_page=12):
+        self.queryset = queryset
+        self.per_page = per_page
+
+    def dump_key(self, obj):
+        return obj.created_at.isoformat()
+
+    def load_key(self, value):
+        return datetime.fromisoformat(value)
+
+    def encode_cursor(self, obj, direction):
+        return signing.dumps(
+            {'c': self.dump_key(obj), 'i': obj.pk, 'd': direction},
+            salt=self.salt,
+            compress=True,
+        )
+
+    def decode_cursor(self, token):
+        try:
+            data = signing.loads(token, salt=self.salt)
+            return self.load_key(data['c']), int(data['i']), data['d']
+        except (signing.BadSignature, KeyError, TypeError, ValueError):
+            raise InvalidCursor(token)
+
+    def page(self, cursor=None):
+        queryset, backward, has_previous = self._page_queryset(cursor)
+        return self._build_page(list(queryset), backward, has_previous)
+
+    async def apage(self, cursor=None):
+        """Versão assíncrona de page()"""
+        queryset, backward, has_previous = self._page_queryset(cursor)
+        return self._build_page([obj async for obj in queryset], backward, has_previous)
+
+    def get_page(self, cursor=None):
+        """Como page(), mas volta para a primeira página se o cursor for inválido"""
+        try:
+            return self.page(cursor)
+        except InvalidCursor:
+            return self.page()
+
+    async def aget_page(self, cursor=None):
+        try:
+            return await self.apage(cursor)
+        except InvalidCursor:
+            return await self.apage()
+
+    def _page_queryset(self, cursor):
+        """(consulta da página com uma linha a mais, se é uma página anterior, se há página anterior)"""
+        limit = self.per_page + 1
+        if not cursor:
+            return self.queryset.order_by(*self.ordering)[:limit], False, False
+
+        value, pk, direction = self.decode_cursor(cursor)
+        key = self.key
+        if direction == 'prev':
+            queryset = self.queryset.filter(Q(**{f'{key}__gt': value}) | Q(**{key: value, 'pk__gt': pk}))
+            return queryset.order_by(key, 'pk')[:limit], True, None
+        queryset = self.queryset.filter(Q(**{f'{key}__lt': value}) | Q(**{key: value, 'pk__lt': pk}))
+        return queryset.order_by(*self.ordering)[:limit], False, True
+
+    def _build_page(self, rows, backward, has_previous):
+        if backward:
+            # Página anterior: a linha a mais indica que existe outra antes dela
+            has_previous = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+            rows.reverse()
+            has_next = bool(rows)
+        else:
+            has_next = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+            has_previous = has_previous and bool(rows)
+        return KeysetPage(
+            rows,
+            next_cursor=self.encode_cursor(rows[-1], 'next') if has_next else None,
+            previous_cursor=self.encode_cursor(rows[0], 'prev') if has_previous else None,
+        )
+
+
+class RankedKeysetPaginator(KeysetPaginator):
+    """
+    Paginação por cursor sobre (search_rank, id), do mais relevante para o
+    menos relevante. O queryset precisa da anotação ``search_rank`` (busca
+    com ``ranked=True``).
+    """
+
+    salt = 'activities.pagination.ranked-cursor'
+    key = 'search_rank'
+    ordering = ('-search_rank', '-pk')
+
+    def dump_key(self, obj):
+        return obj.search_rank
+
+    def load_key(self, value):
+        return float(value)
@@ -0,0 +1,255 @@
+"""
+Proxy com cache em disco para as imagens externas de ``Activity.image_url``.
+
+Cada imagem é baixada uma vez, redimensionada para uma das larguras
+permitidas e guardada em MEDIA_ROOT/proxy. O diretório tem um limite de
+tamanho: quando passa dele, os arquivos usados há mais tempo são apagados
+(o mtime é atualizado a cada acesso). O tamanho total fica num contador no
+cache do Django, então o diretório só é percorrido quando o limite estoura
+(e não a cada imagem nova). O download é feito por um "fetcher"
+configurável em IMAGE_PROXY_FETCHER, o que permite testar sem internet.
+"""
+import hashlib
+import http.client
+import ipaddress
+import os
+import socket
+import tempfile
+from io import BytesIO
+from pathlib import Path
+from urllib.parse import urlparse
+from urllib.request import (
+    HTTPDefaultErrorHandler, HTTPErrorProcessor, HTTPHandler, HTTPRedirectHandler, HTTPSHandler,
+    OpenerDirector, Request,
+)
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+from PIL import Image, ImageOps
+
+from .images import IMAGE_VARIANTS, resize
+
+# Larguras servidas pelo proxy: as mesmas das variações das imagens enviadas
+PROXY_WIDTHS = sorted({width for width, _ in IMAGE_VARIANTS.values()})
+PROXY_FORMATS = {
+    'webp': ('WEBP', 'image/webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', 'image/jpeg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+class FetchError(Exception):
+    pass
+
+
+def is_public_address(address):
+    return ipaddress.ip_address(address).is_global
+
+
+def resolve_public_address(host, port, allow_private=False):
+    """
+    Resolve ``host`` e devolve um endereço para a conexão, recusando hosts
+    que apontem para a rede interna do servidor (localhost, rede privada,
+    metadados da nuvem...).
+    """
+    try:
+        addresses = [info[4][0] for info in socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)]
+    except socket.gaierror as exc:
+        raise FetchError(str(exc)) from exc
+    if not allow_private and not all(is_public_address(address) for address in addresses):
+        raise FetchError(f'Endereço não permitido: {host}')
+    return addresses[0]
+
+
+class CheckedAddressMixin:
+    """
+    Conexão que valida o endereço no momento de conectar e conecta nesse
+    mesmo endereço: vale para cada redirecionamento e impede que o DNS
+    devolva outro IP entre a verificação e a conexão (DNS rebinding).
+    """
+
+    def __init__(self, *args, allow_private=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.allow_private = allow_private
+        self._create_connection = self.create_checked_connection
+
+    def create_checked_connection(self, address, timeout, source_address=None):
+        host, port = address
+        return socket.create_connection(
+            (resolve_public_address(host, port, self.allow_private), port), timeout, source_address,
+        )
+
+
+class CheckedHTTPConnection(CheckedAddressMixin, http.client.HTTPConnection):
+    pass
+
+
+class CheckedHTTPSConnection(CheckedAddressMixin, http.client.HTTPSConnection):
+    # O TLS continua validando o certificado pelo nome do host (self.host)
+    pass
+
+
+class CheckedHTTPHandler(HTTPHandler):
+    def __init__(self, allow_private=False):
+        super().__init__()
+        self.allow_private = allow_private
+
+    def http_open(self, req):
+        return self.do_open(CheckedHTTPConnection, req, allow_private=self.allow_private)
+
+
+class CheckedHTTPSHandler(HTTPSHandler):
+    def __init__(self, allow_private=False):
+        super().__init__()
+        self.allow_private = allow_private
+
+    def https_open(self, req):
+        return self.do_open(CheckedHTTPSConnection, req, context=self._context, allow_private=self.allow_private)
+
+
+class LimitedRedirectHandler(HTTPRedirectHandler):
+    """Segue poucos redirecionamentos, e só para http/https"""
+
+    max_redirections = 3
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        if urlparse(newurl).scheme not in ('http', 'https'):
+            raise FetchError(f'Redirecionamento não permitido: {newurl}')
+        return super().redirect_request(req, fp, code, msg, headers, newurl)
+
+
+def build_opener(allow_private=False):
+    """Opener só com HTTP(S): sem ftp://, file:// nem proxies do ambiente"""
+    opener = OpenerDirector()
+    for handler in (
+        CheckedHTTPHandler(allow_private), CheckedHTTPSHandler(allow_private), LimitedRedirectHandler(),
+        HTTPDefaultErrorHandler(), HTTPErrorProcessor(),
+    ):
+        opener.add_handler(handler)
+    return opener
+
+
+class UrllibFetcher:
+    """Baixa a imagem com urllib, respeitando tempo e tamanho máximos"""
+
+    user_agent = 'ufc-activities-image-proxy/1.0'
+
+    def fetch(self, url, max_bytes, timeout):
+        parsed = urlparse(url)
+        if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+            raise FetchError(f'URL não suportada: {url}')
+        opener = build_opener(allow_private=getattr(settings, 'IMAGE_PROXY_ALLOW_PRIVATE_HOSTS', False))
+        try:
+            with opener.open(Request(url, headers={'User-Agent': self.user_agent}), timeout=timeout) as response:
+                data = response.read(max_bytes + 1)
+        except OSError as exc:
+            raise FetchError(str(exc)) from exc
+        if len(data) > max_bytes:
+            raise FetchError(f'Imagem maior que {max_bytes} bytes')
+        return data
+
+
+def get_fetcher():
+    return import_string(getattr(settings, 'IMAGE_PROXY_FETCHER', 'activities.proxy.UrllibFetcher'))()
+
+
+def url_version(url):
+    """Identificador curto da URL de origem, usado para invalidar o cache do navegador"""
+    return hashlib.sha256(url.encode()).hexdigest()[:12]
+
+
+class ImageProxyCache:
+    def __init__(self, directory=None, max_bytes=None):
+        self.directory = Path(directory or Path(settings.MEDIA_ROOT) / 'proxy')
+        self.max_bytes = max_bytes or getattr(settings, 'IMAGE_PROXY_CACHE_MAX_BYTES', 200 * 1024 * 1024)
+
+    def path_for(self, url, width, image_format):
+        key = hashlib.sha256(f'{url}|{width}'.encode()).hexdigest()
+        return self.directory / key[:2] / f'{key}.{image_format}'
+
+    @property
+    def size_key(self):
+        return 'activities:proxy-size:' + hashlib.md5(str(self.directory).encode()).hexdigest()
+
+    def get(self, url, width, image_format):
+        """Caminho do arquivo em cache, gerando-o se necessário"""
+        path = self.path_for(url, width, image_format)
+        try:
+            os.utime(path)  # marca como usado recentemente (LRU)
+            return path
+        except FileNotFoundError:
+            pass
+        content = self.render(url, width, image_format)
+        self.store(path, content)
+        if self.add_size(len(content)) > self.max_bytes:
+            self.evict()
+        return path
+
+    def open(self, url, width, image_format):
+        """
+        Arquivo em cache já aberto para leitura. Depois de aberto ele continua
+        legível mesmo que outro worker o apague ao liberar espaço (LRU).
+        """
+        for _ in range(2):
+            try:
+                return self.get(url, width, image_format).open('rb')
+            except FileNotFoundError:
+                # Apagado entre get() e open(): gera de novo
+                continue
+        return BytesIO(self.render(url, width, image_format))
+
+    def render(self, url, width, image_format):
+        data = get_fetcher().fetch(
+            url,
+            max_bytes=getattr(settings, 'IMAGE_PROXY_MAX_SOURCE_BYTES', 10 * 1024 * 1024),
+            timeout=getattr(settings, 'IMAGE_PROXY_TIMEOUT', 5),
+        )
+        try:
+            image = Image.open(BytesIO(data))
+            image = ImageOps.exif_transpose(image).convert('RGB')
+        except (OSError, Image.DecompressionBombError) as exc:
+            raise FetchError(f'Imagem inválida: {exc}') from exc
+        pil_format, _, options = PROXY_FORMATS[image_format]
+        buffer = BytesIO()
+        resize(image, width, None).save(buffer, pil_format, **options)
+        return buffer.getvalue()
+
+    def store(self, path, content):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Grava num arquivo temporário e renomeia: outra requisição nunca lê um arquivo pela metade
+        handle, temporary = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        with os.fdopen(handle, 'wb') as file:
+            file.write(content)
+        os.replace(temporary, path)
+
+    def entries(self):
+        """(mtime, tamanho, caminho) de cada arquivo do cache"""
+        for path in self.directory.glob('*/*'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            yield stat.st_mtime, stat.st_size, path
+
+    def add_size(self, size):
+        """Soma ``size`` ao tamanho total do cache e o devolve"""
+        try:
+            return cache.incr(self.size_key, size)
+        except ValueError:
+            # Contador ainda não existe (ou foi descartado pelo cache): conta os arquivos
+            total = sum(size for _, size, _ in self.entries())
+            cache.set(self.size_key, total, None)
+            return total
+
+    def evict(self):
+        """Apaga os arquivos usados há mais tempo até o cache ficar abaixo de 90% do limite"""
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for _, size, path in entries:
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+        # Recalculado a partir dos arquivos: corrige o que outras requisições somaram em paralelo
+        cache.set(self.size_key, total, None)
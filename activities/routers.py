@@ -0,0 +1,70 @@
+"""
+Roteamento entre o banco principal e as réplicas de leitura.
+
+Por padrão tudo vai para o ``default``. Só as views listadas em
+REPLICA_READ_VIEWS leem de uma réplica, e só quando o visitante não escreveu
+nada recentemente: depois de um POST que grava no banco, o
+ReplicaRoutingMiddleware marca o navegador com um cookie e as próximas
+requisições leem do principal até a réplica ter tempo de alcançá-lo.
+"""
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+
+_request_routing = ContextVar('activities_request_routing', default=None)
+
+
+class RequestRouting:
+    """Estado de roteamento da requisição atual"""
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.replica = None
+        self.wrote = False
+
+
+def start_request(pinned=False):
+    routing = RequestRouting(pinned=pinned)
+    return routing, _request_routing.set(routing)
+
+
+def finish_request(token):
+    _request_routing.reset(token)
+
+
+def use_replica():
+    """Escolhe uma réplica para o resto da requisição (se houver e se não estiver fixada no principal)"""
+    routing = _request_routing.get()
+    replicas = getattr(settings, 'REPLICA_DATABASES', [])
+    if routing is not None and replicas and not routing.pinned:
+        routing.replica = random.choice(replicas)
+
+
+def is_pinned():
+    """Se a requisição atual lê do principal porque o visitante escreveu há pouco"""
+    routing = _request_routing.get()
+    return routing is not None and routing.pinned
+
+
+def reading_from_replica():
+    routing = _request_routing.get()
+    return routing is not None and bool(routing.replica) and not routing.wrote
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        routing = _request_routing.get()
+        if routing is not None and routing.replica and not routing.wrote:
+            return routing.replica
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        routing = _request_routing.get()
+        if routing is not None:
+            routing.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Réplicas têm os mesmos dados do principal
+        return True
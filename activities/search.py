@@ -0,0 +1,230 @@
+"""
+Índice de busca textual das atividades.
+
+No SQLite o índice é uma tabela virtual FTS5 e no PostgreSQL uma tabela com
+uma coluna tsvector indexada por GIN. Nos dois casos a tabela é mantida em
+sincronia pelos signals em ``activities/signals.py`` e as views acessam tudo
+por meio de ``search_activities``.
+"""
+import re
+import unicodedata
+
+from django.db import DEFAULT_DB_ALIAS, connections, router
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+from .models import Activity, ActivityTag
+
+FTS_TABLE = 'activities_activity_fts'
+PG_TABLE = 'activities_activity_search'
+
+# Ordem das colunas do índice e pesos usados no ranking
+INDEXED_FIELDS = ('title', 'description', 'coordinator', 'location', 'tags')
+FIELD_WEIGHTS = {'title': 10.0, 'description': 1.0, 'coordinator': 3.0, 'location': 2.0, 'tags': 5.0}
+PG_WEIGHT_CLASSES = {'title': 'A', 'description': 'D', 'coordinator': 'C', 'location': 'C', 'tags': 'B'}
+
+
+def normalize_text(text):
+    """Remove acentos e coloca em minúsculas ("Extensão" -> "extensao")"""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def tokenize(text):
+    return re.findall(r'\w+', normalize_text(text))
+
+
+def empty_result(queryset, ranked):
+    """Termo sem nenhuma palavra (só pontuação): nenhum resultado, com a mesma anotação de ranking"""
+    queryset = queryset.none()
+    if ranked:
+        queryset = queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+    return queryset
+
+
+class SearchBackend:
+    vendor = None
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def documents(self, activity_ids):
+        """Monta os documentos indexados (um dict por atividade) em duas consultas"""
+        tags = {}
+        alias = self.connection.alias
+        through = ActivityTag.activities.through.objects.using(alias).filter(activity_id__in=activity_ids)
+        for activity_id, name in through.values_list('activity_id', 'activitytag__name'):
+            tags.setdefault(activity_id, []).append(name)
+        rows = Activity.objects.using(alias).filter(pk__in=activity_ids).values('pk', *INDEXED_FIELDS[:-1])
+        for row in rows:
+            row['tags'] = ' '.join(tags.get(row['pk'], []))
+            yield row
+
+    def index(self, activity_ids):
+        raise NotImplementedError
+
+    def remove(self, activity_ids):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def filter(self, queryset, term, ranked=False):
+        raise NotImplementedError
+
+    def rebuild(self, batch_size=1000):
+        self.clear()
+        ids = list(Activity.objects.using(self.connection.alias).values_list('pk', flat=True))
+        for start in range(0, len(ids), batch_size):
+            self.index(ids[start:start + batch_size])
+        return len(ids)
+
+
+class SQLiteFTSBackend(SearchBackend):
+    vendor = 'sqlite'
+
+    def index(self, activity_ids):
+        rows = [
+            (doc['pk'], *(normalize_text(doc[field]) for field in INDEXED_FIELDS))
+            for doc in self.documents(activity_ids)
+        ]
+        with self.connection.cursor() as cursor:
+            self._delete(cursor, activity_ids)
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (rowid, {", ".join(INDEXED_FIELDS)}) VALUES (%s, %s, %s, %s, %s, %s)',
+                rows,
+            )
+
+    def remove(self, activity_ids):
+        with self.connection.cursor() as cursor:
+            self._delete(cursor, activity_ids)
+
+    def clear(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+
+    def _delete(self, cursor, activity_ids):
+        cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(pk,) for pk in activity_ids])
+
+    def build_query(self, term):
+        # Cada termo vira uma busca por prefixo; termos separados são combinados com AND
+        return ' '.join(f'"{token}"*' for token in tokenize(term))
+
+    def filter(self, queryset, term, ranked=False):
+        query = self.build_query(term)
+        if not query:
+            return empty_result(queryset, ranked)
+        queryset = queryset.filter(
+            pk__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [query])
+        )
+        if ranked:
+            weights = ', '.join(str(FIELD_WEIGHTS[field]) for field in INDEXED_FIELDS)
+            # bm25() é negativo: quanto menor, mais relevante
+            queryset = queryset.annotate(search_rank=RawSQL(
+                f'SELECT -bm25({FTS_TABLE}, {weights}) FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s AND rowid = {Activity._meta.db_table}.id',
+                [query],
+                output_field=FloatField(),
+            ))
+        return queryset
+
+
+class PostgresSearchBackend(SearchBackend):
+    vendor = 'postgresql'
+    config = 'portuguese'
+
+    def index(self, activity_ids):
+        document = ' || '.join(
+            f"setweight(to_tsvector('{self.config}', %s), '{PG_WEIGHT_CLASSES[field]}')"
+            for field in INDEXED_FIELDS
+        )
+        rows = [
+            (doc['pk'], *(normalize_text(doc[field]) for field in INDEXED_FIELDS))
+            for doc in self.documents(activity_ids)
+        ]
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {PG_TABLE} (activity_id, document) VALUES (%s, {document}) '
+                'ON CONFLICT (activity_id) DO UPDATE SET document = EXCLUDED.document',
+                rows,
+            )
+
+    def remove(self, activity_ids):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {PG_TABLE} WHERE activity_id = ANY(%s)', [list(activity_ids)])
+
+    def clear(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'TRUNCATE {PG_TABLE}')
+
+    def build_query(self, term):
+        return ' & '.join(f'{token}:*' for token in tokenize(term))
+
+    def filter(self, queryset, term, ranked=False):
+        query = self.build_query(term)
+        if not query:
+            return empty_result(queryset, ranked)
+        tsquery = f"to_tsquery('{self.config}', %s)"
+        queryset = queryset.filter(
+            pk__in=RawSQL(f'SELECT activity_id FROM {PG_TABLE} WHERE document @@ {tsquery}', [query])
+        )
+        if ranked:
+            queryset = queryset.annotate(search_rank=RawSQL(
+                f'SELECT ts_rank(document, {tsquery}) FROM {PG_TABLE} '
+                f'WHERE activity_id = {Activity._meta.db_table}.id',
+                [query],
+                output_field=FloatField(),
+            ))
+        return queryset
+
+
+class LikeSearchBackend(SearchBackend):
+    """Busca por icontains para bancos sem índice textual configurado"""
+
+    def index(self, activity_ids):
+        pass
+
+    def remove(self, activity_ids):
+        pass
+
+    def clear(self):
+        pass
+
+    def filter(self, queryset, term, ranked=False):
+        queryset = queryset.filter(
+            Q(title__icontains=term) |
+            Q(description__icontains=term) |
+            Q(coordinator__icontains=term) |
+            Q(location__icontains=term)
+        )
+        if ranked:
+            queryset = queryset.annotate(search_rank=RawSQL('0', [], output_field=FloatField()))
+        return queryset
+
+
+BACKENDS = {backend.vendor: backend for backend in (SQLiteFTSBackend, PostgresSearchBackend)}
+
+
+def get_backend(using=None):
+    conn = connections[using or DEFAULT_DB_ALIAS]
+    return BACKENDS.get(conn.vendor, LikeSearchBackend)(conn)
+
+
+def search_activities(queryset, term, ranked=False):
+    """
+    Filtra ``queryset`` pelas atividades que casam com ``term``.
+
+    Com ``ranked=True`` as atividades recebem a anotação ``search_rank``
+    (maior é mais relevante).
+    """
+    return get_backend(queryset.db).filter(queryset, term, ranked=ranked)
+
+
+def index_activities(activity_ids):
+    if activity_ids:
+        get_backend(router.db_for_write(Activity)).index(list(activity_ids))
+
+
+def remove_activities(activity_ids):
+    if activity_ids:
+        get_backend(router.db_for_write(Activity)).remove(list(activity_ids))
@@ -0,0 +1,135 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .cache import bump_pages_version, bump_tags_version
+from .counters import apply_deltas, transition
+from .images import delete_variants, schedule_variants, variants_are_stale
+from .models import Activity, ActivityRequirement, ActivityTag
+from .search import index_activities, remove_activities
+from .stats import invalidate_dashboard_stats
+
+
+@receiver(post_save, sender=Activity)
+@receiver(post_delete, sender=Activity)
+def refresh_dashboard_stats(sender, **kwargs):
+    invalidate_dashboard_stats()
+
+
+@receiver(pre_save, sender=Activity)
+def remember_counter_key(sender, instance, **kwargs):
+    """Tipo e status gravados antes desta alteração, para ajustar os contadores"""
+    instance._counter_key = None
+    if not instance._state.adding:
+        instance._counter_key = Activity.objects.filter(pk=instance.pk).values_list('type', 'status').first()
+
+
+@receiver(post_save, sender=Activity)
+def count_saved_activity(sender, instance, created, **kwargs):
+    old = None if created else getattr(instance, '_counter_key', None)
+    apply_deltas(transition(old, (instance.type, instance.status)))
+
+
+@receiver(post_delete, sender=Activity)
+def count_deleted_activity(sender, instance, **kwargs):
+    apply_deltas(transition((instance.type, instance.status), None))
+
+
+@receiver(post_save, sender=Activity)
+@receiver(post_delete, sender=Activity)
+@receiver(post_save, sender=ActivityTag)
+@receiver(post_delete, sender=ActivityTag)
+@receiver(m2m_changed, sender=ActivityTag.activities.through)
+@receiver(post_save, sender=ActivityRequirement)
+@receiver(post_delete, sender=ActivityRequirement)
+def refresh_public_pages(sender, **kwargs):
+    if kwargs.get('action', 'post_').startswith('post_'):
+        bump_pages_version()
+
+
+@receiver(post_save, sender=ActivityTag)
+@receiver(post_delete, sender=ActivityTag)
+def refresh_activity_cards(sender, **kwargs):
+    bump_tags_version()
+
+
+@receiver(post_save, sender=Activity)
+def index_saved_activity(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_activities([instance.pk])
+
+
+@receiver(post_delete, sender=Activity)
+def remove_deleted_activity(sender, instance, **kwargs):
+    remove_activities([instance.pk])
+
+
+def touch_activities(activity_ids):
+    """Tags e requisitos aparecem nas páginas da atividade, então contam como modificação"""
+    if activity_ids:
+        Activity.objects.filter(pk__in=activity_ids).touch()
+
+
+@receiver(m2m_changed, sender=ActivityTag.activities.through)
+def tags_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Reindexa e marca como modificadas as atividades cujas tags mudaram"""
+    if action == 'pre_clear' and not reverse:
+        # tag.activities.clear(): guarda as atividades antes que a relação some
+        instance._cleared_activity_ids = list(instance.activities.values_list('pk', flat=True))
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        # activity.tags.add/remove/set/clear
+        activity_ids = [instance.pk]
+    elif action == 'post_clear':
+        activity_ids = getattr(instance, '_cleared_activity_ids', [])
+    else:
+        activity_ids = list(pk_set)
+    index_activities(activity_ids)
+    touch_activities(activity_ids)
+
+
+@receiver(post_save, sender=ActivityTag)
+def tag_renamed(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        activity_ids = list(instance.activities.values_list('pk', flat=True))
+        index_activities(activity_ids)
+        touch_activities(activity_ids)
+
+
+@receiver(pre_delete, sender=ActivityTag)
+def remember_tag_activities(sender, instance, **kwargs):
+    instance._deleted_activity_ids = list(instance.activities.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=ActivityTag)
+def tag_deleted(sender, instance, **kwargs):
+    activity_ids = getattr(instance, '_deleted_activity_ids', [])
+    index_activities(activity_ids)
+    touch_activities(activity_ids)
+
+
+@receiver(post_save, sender=ActivityRequirement)
+@receiver(post_delete, sender=ActivityRequirement)
+def requirement_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        touch_activities([instance.activity_id])
+
+
+@receiver(post_save, sender=Activity)
+def process_uploaded_image(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    if variants_are_stale(instance):
+        schedule_variants(instance.pk)
+    elif not instance.image and instance.image_variants:
+        # Imagem removida: apaga as variações antigas
+        delete_variants(instance.image_variants)
+        Activity.objects.filter(pk=instance.pk).update(image_variants={})
+        instance.image_variants = {}
+
+
+@receiver(post_delete, sender=Activity)
+def remove_image_variants(sender, instance, **kwargs):
+    if instance.image_variants:
+        transaction.on_commit(lambda: delete_variants(instance.image_variants))
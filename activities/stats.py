@@ -0,0 +1,63 @@
+import asyncio
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .cache import shared_timeout, use_shared_cache
+from .counters import aget_counts, dashboard_totals, get_counts
+from .models import Activity
+
+DASHBOARD_STATS_CACHE_KEY = 'activities:dashboard-stats'
+
+
+def recent_activities():
+    return Activity.objects.order_by('-created_at')[:5]
+
+
+def build_dashboard_stats(totals, recent):
+    stats = {key: value for key, value in totals.items() if not key.startswith('type_')}
+    stats['activities_by_type'] = [
+        {'type': activity_type, 'count': totals[f'type_{activity_type}']}
+        for activity_type, _ in Activity.ACTIVITY_TYPES
+        if totals[f'type_{activity_type}']
+    ]
+    stats['recent_activities'] = recent
+    return stats
+
+
+def compute_dashboard_stats():
+    """Estatísticas do dashboard a partir dos contadores por tipo e status"""
+    totals = dashboard_totals(get_counts())
+    return build_dashboard_stats(totals, list(recent_activities()))
+
+
+async def acompute_dashboard_stats():
+    """Versão assíncrona: os contadores e as atividades recentes são pedidos ao mesmo tempo"""
+    async def fetch_recent():
+        return [activity async for activity in recent_activities()]
+
+    counts, recent = await asyncio.gather(aget_counts(), fetch_recent())
+    return build_dashboard_stats(dashboard_totals(counts), recent)
+
+
+def get_dashboard_stats():
+    """Estatísticas do dashboard, servidas do cache enquanto nenhuma atividade mudar"""
+    stats = cache.get(DASHBOARD_STATS_CACHE_KEY) if use_shared_cache() else None
+    if stats is None:
+        stats = compute_dashboard_stats()
+        timeout = shared_timeout(getattr(settings, 'DASHBOARD_STATS_CACHE_TIMEOUT', 300))
+        cache.set(DASHBOARD_STATS_CACHE_KEY, stats, timeout)
+    return stats
+
+
+async def aget_dashboard_stats():
+    stats = await cache.aget(DASHBOARD_STATS_CACHE_KEY) if use_shared_cache() else None
+    if stats is None:
+        stats = await acompute_dashboard_stats()
+        timeout = shared_timeout(getattr(settings, 'DASHBOARD_STATS_CACHE_TIMEOUT', 300))
+        await cache.aset(DASHBOARD_STATS_CACHE_KEY, stats, timeout)
+    return stats
+
+
+def invalidate_dashboard_stats():
+    cache.delete(DASHBOARD_STATS_CACHE_KEY)
@@ -0,0 +1,82 @@
+"""
+Geração de atividades sintéticas para testes de carga.
+
+Os registros seguem o formato aceito pelo ActivityImporter e imitam a
+distribuição dos dados reais: poucas tags muito populares e muitas raras
+(lei de Zipf), descrições de tamanho variado e datas espalhadas ao longo
+do ano letivo.
+"""
+import random
+from datetime import date, timedelta
+
+TOPICS = [
+    'Django', 'Python', 'Aprendizado de Máquina', 'Redes de Computadores', 'Banco de Dados',
+    'Segurança da Informação', 'Computação em Nuvem', 'Robótica', 'Empreendedorismo',
+    'Sustentabilidade', 'Educação Ambiental', 'Saúde Pública', 'Estatística', 'Física Quântica',
+    'Bioinformática', 'Design de Interfaces', 'Libras', 'Escrita Acadêmica', 'Energias Renováveis',
+    'Processamento de Linguagem Natural', 'Visão Computacional', 'Música e Tecnologia',
+]
+TITLE_PATTERNS = {
+    'COURSE': ['Curso de {topic}', 'Introdução a {topic}', '{topic} para Iniciantes'],
+    'WORKSHOP': ['Workshop de {topic}', 'Oficina Prática de {topic}'],
+    'SEMINAR': ['Seminário de {topic}', 'Ciclo de Palestras sobre {topic}'],
+    'RESEARCH': ['Projeto de Pesquisa em {topic}', 'Grupo de Estudos em {topic}'],
+    'EXTENSION': ['{topic} na Comunidade', 'Projeto de Extensão em {topic}'],
+    'OTHER': ['Encontro de {topic}', 'Maratona de {topic}'],
+}
+# Proporção aproximada de cada tipo e status nos dados reais
+TYPE_WEIGHTS = {'COURSE': 35, 'WORKSHOP': 25, 'SEMINAR': 15, 'RESEARCH': 10, 'EXTENSION': 10, 'OTHER': 5}
+STATUS_WEIGHTS = {'PENDING': 40, 'IN_PROGRESS': 25, 'COMPLETED': 30, 'CANCELLED': 5}
+SENTENCES = [
+    'Os participantes desenvolverão projetos práticos ao longo dos encontros.',
+    'A atividade é aberta a estudantes de graduação e pós-graduação.',
+    'Serão abordados conceitos fundamentais e aplicações em problemas reais.',
+    'Ao final, os participantes receberão certificado de participação.',
+    'As vagas são limitadas e a inscrição deve ser feita pelo sistema acadêmico.',
+    'O material de apoio será disponibilizado no ambiente virtual.',
+    'Haverá momentos de discussão em grupo e apresentação de resultados.',
+    'A programação inclui convidados de outras instituições.',
+]
+LOCATIONS = ['Laboratório de Informática {n}', 'Auditório {n}', 'Sala {n} do Bloco 9', 'Online']
+COORDINATORS = ['Ana', 'Bruno', 'Carla', 'Davi', 'Elisa', 'Fábio', 'Gabriela', 'Heitor', 'Íris', 'João']
+REQUIREMENTS = [
+    'Notebook próprio', 'Conhecimentos básicos de programação', 'Inscrição prévia',
+    'Disponibilidade aos sábados', 'Estar matriculado na UFC', 'Leitura do material introdutório',
+]
+
+
+def weighted(rng, weights):
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def generate_records(count, tags_per_activity=3, requirements_per_activity=2, tag_pool=200, seed=None):
+    """Gera ``count`` registros de atividades (dicts) de forma determinística para um mesmo ``seed``"""
+    rng = random.Random(seed)
+    tags = [f'tag {i}' for i in range(tag_pool)] if tag_pool else []
+    # Zipf: a i-ésima tag mais popular aparece ~1/i vezes
+    tag_weights = [1 / rank for rank in range(1, len(tags) + 1)]
+    first_day = date.today() - timedelta(days=180)
+
+    for number in range(count):
+        activity_type = weighted(rng, TYPE_WEIGHTS)
+        topic = rng.choice(TOPICS)
+        start_date = first_day + timedelta(days=rng.randrange(365))
+        # A maioria das atividades dura alguns dias; algumas, o semestre inteiro
+        duration = min(int(rng.expovariate(1 / 10)), 120)
+        sentences = max(1, min(int(rng.lognormvariate(1.2, 0.5)), len(SENTENCES)))
+        activity_tags = set(rng.choices(tags, weights=tag_weights, k=tags_per_activity)) if tags else set()
+        yield {
+            'title': f'{rng.choice(TITLE_PATTERNS[activity_type]).format(topic=topic)} #{number + 1}',
+            'description': f'Atividade sobre {topic}. ' + ' '.join(rng.sample(SENTENCES, sentences)),
+            'type': activity_type,
+            'status': weighted(rng, STATUS_WEIGHTS),
+            'start_date': start_date,
+            'end_date': start_date + timedelta(days=duration),
+            'time': f'{rng.choice([8, 10, 14, 16, 19]):02d}:00',
+            'location': rng.choice(LOCATIONS).format(n=rng.randint(1, 5)),
+            'coordinator': f'Prof. {rng.choice(COORDINATORS)} {rng.choice(COORDINATORS)}',
+            'participants': max(1, int(rng.gauss(30, 12))),
+            'tags': sorted(activity_tags),
+            'requirements': rng.sample(REQUIREMENTS, min(requirements_per_activity, len(REQUIREMENTS))),
+        }
+
@@ -0,0 +1,19 @@
+from django import template
+
+from activities.cache import get_tags_version
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def tags_version(context):
+    """
+    Versão das tags para a chave do cache dos cards, lida do cache uma vez por
+    requisição (e não uma vez por card).
+    """
+    request = context.get('request')
+    if request is None:
+        return get_tags_version()
+    if not hasattr(request, '_tags_version'):
+        request._tags_version = get_tags_version()
+    return request._tags_version
@@ -0,0 +1,9 @@
+from django import template
+
+register = template.Library()
+
+
+@register.filter
+def count_for(counts, value):
+    """Quantidade de uma opção nas contagens de uma faceta ({{ type_counts|count_for:value }})"""
+    return (counts or {}).get(value, 0)
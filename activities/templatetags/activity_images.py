@@ -0,0 +1,57 @@
+from django import template
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from django.utils.html import format_html
+from django.utils.http import urlencode
+
+from activities.images import IMAGE_VARIANTS
+from activities.proxy import url_version
+
+register = template.Library()
+
+
+def variant_srcset(variants, name, extension):
+    """ "card.webp 400w, card_2x.webp 800w" a partir da variação e da sua versão 2x"""
+    candidates = [variants.get(name), variants.get(f'{name}_2x')]
+    return ', '.join(
+        f'{default_storage.url(variant[extension])} {variant["width"]}w'
+        for variant in candidates
+        if variant and variant.get(extension)
+    )
+
+
+@register.simple_tag
+def activity_picture(activity, variant='card', sizes='100vw', css_class=''):
+    """
+    <picture> com WebP e JPEG (1x e 2x) da imagem da atividade. Sem variações
+    geradas, usa a imagem externa (image_url) pelo proxy; sem nenhuma, fica vazio.
+
+        {% activity_picture activity 'card' sizes='(min-width: 1024px) 33vw, 100vw' css_class='w-full' %}
+    """
+    variants = activity.image_variants or {}
+    base = variants.get(variant)
+    if not base:
+        if activity.image_url:
+            return proxied_image(activity, variant, sizes, css_class)
+        return ''
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}" alt="{}" class="{}" loading="lazy" decoding="async">'
+        '</picture>',
+        variant_srcset(variants, variant, 'webp'), sizes,
+        default_storage.url(base['jpeg']), variant_srcset(variants, variant, 'jpeg'), sizes,
+        base['width'], base['height'], activity.title, css_class,
+    )
+
+
+def proxied_image(activity, variant, sizes, css_class):
+    """<img> servido pelo proxy de imagens externas (image_url), nas larguras 1x e 2x"""
+    base_url = reverse('activity_image_proxy', args=[activity.pk])
+    version = url_version(activity.image_url)
+    widths = [IMAGE_VARIANTS[name][0] for name in (variant, f'{variant}_2x') if name in IMAGE_VARIANTS]
+    urls = [f'{base_url}?{urlencode({"w": width, "v": version})}' for width in widths]
+    return format_html(
+        '<img src="{}" srcset="{}" sizes="{}" alt="{}" class="{}" loading="lazy" decoding="async">',
+        urls[0], ', '.join(f'{url} {width}w' for url, width in zip(urls, widths)), sizes,
+        activity.title, css_class,
+    )
@@ -0,0 +1,131 @@
+"""
+Pré-compilação e medição dos templates do projeto.
+
+Com o loader em cache (settings_production), cada template é lido e compilado
+uma vez por processo. warm_templates() faz isso na subida do worker (wsgi.py e
+asgi.py, com TEMPLATE_WARMUP), para que a primeira requisição de cada página
+não pague a compilação. benchmark_templates() compara, template a template, a
+renderização "fria" (leitura + compilação + render) com a "quente" (só render).
+"""
+import logging
+import statistics
+import time
+from pathlib import Path
+
+from django.template import Engine, TemplateSyntaxError, engines
+from django.template.autoreload import get_template_directories
+from django.template.context import make_context
+from django.test import RequestFactory
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
+
+def project_template_names():
+    """Templates .html do projeto (templates/ e apps locais; os do Django ficam de fora)"""
+    names = set()
+    for directory in get_template_directories():
+        for path in Path(directory).rglob('*.html'):
+            names.add(path.relative_to(directory).as_posix())
+    return sorted(names)
+
+
+def warm_templates(template_engines=None):
+    """Compila todos os templates do projeto no cache dos loaders; devolve quantos"""
+    started = time.perf_counter()
+    warmed = 0
+    for engine in template_engines or engines.all():
+        for name in project_template_names():
+            try:
+                engine.get_template(name)
+            except TemplateSyntaxError:
+                logger.exception('Template inválido: %s', name)
+            else:
+                warmed += 1
+    logger.info('%d templates pré-compilados em %.1fms', warmed, (time.perf_counter() - started) * 1000)
+    return warmed
+
+
+def build_engine(cached):
+    """Engine com a mesma configuração do projeto, com ou sem o loader em cache"""
+    engine = engines['django'].engine
+    loaders = [('django.template.loaders.cached.Loader', TEMPLATE_LOADERS)] if cached else TEMPLATE_LOADERS
+    return Engine(
+        dirs=engine.dirs,
+        context_processors=engine.context_processors,
+        loaders=loaders,
+        string_if_invalid=engine.string_if_invalid,
+        file_charset=engine.file_charset,
+        libraries=engine.libraries,
+        autoescape=engine.autoescape,
+    )
+
+
+def measure_warmup():
+    """(templates, ms) da pré-compilação feita na subida do worker, num engine com cache ainda vazio"""
+    started = time.perf_counter()
+    warmed = warm_templates([build_engine(cached=True)])
+    return warmed, round((time.perf_counter() - started) * 1000, 3)
+
+
+def sample_context():
+    """Contexto com dados reais o bastante para renderizar as páginas do app"""
+    from .forms import ActivityForm
+    from .models import Activity
+    from .stats import get_dashboard_stats
+
+    activities = list(Activity.objects.with_tags().order_by('-created_at')[:12])
+    activity = activities[0] if activities else None
+    return {
+        **get_dashboard_stats(),
+        'activities': activities,
+        'activity': activity,
+        'object': activity,
+        'form': ActivityForm(instance=activity),
+        'activity_types': Activity.ACTIVITY_TYPES,
+        'status_choices': Activity.STATUS_CHOICES,
+    }
+
+
+def render(engine, name, context, request):
+    return engine.get_template(name).render(make_context(context, request))
+
+
+def benchmark_templates(iterations=20, names=None):
+    """
+    Mediana, em ms, da renderização fria (engine sem cache: lê e compila a cada
+    vez) e quente (engine com o loader em cache já aquecido) de cada template.
+    """
+    names = names or project_template_names()
+    context = sample_context()
+    request = RequestFactory().get('/')
+    warm_engine = build_engine(cached=True)
+    results = {}
+    for name in names:
+        try:
+            render(warm_engine, name, context, request)
+        except Exception as exc:
+            # Templates que dependem de contexto que o exemplo não tem
+            results[name] = {'error': f'{type(exc).__name__}: {exc}'}
+            continue
+        cold, warm = [], []
+        for _ in range(iterations):
+            cold_engine = build_engine(cached=False)
+            started = time.perf_counter()
+            render(cold_engine, name, context, request)
+            cold.append((time.perf_counter() - started) * 1000)
+
+            started = time.perf_counter()
+            render(warm_engine, name, context, request)
+            warm.append((time.perf_counter() - started) * 1000)
+        cold_ms, warm_ms = statistics.median(cold), statistics.median(warm)
+        results[name] = {
+            'cold_ms': round(cold_ms, 3),
+            'warm_ms': round(warm_ms, 3),
+            'speedup': round(cold_ms / warm_ms, 2) if warm_ms else None,
+        }
+    return results
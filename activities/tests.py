@@ -1,3 +1,1450 @@
-from django.test import TestCase
+import asyncio
+import csv
+import io
+import json
+import threading
+import os
+import sys
+import tempfile
+import time
+import zipfile
+from datetime import date, timedelta
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from importlib import import_module
+from io import StringIO
+from types import ModuleType
+from unittest import mock, skipUnless
+from urllib.parse import parse_qs, urlparse
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib import admin
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.cache.backends.redis import RedisCache, RedisCacheClient, RedisSerializer
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import OperationalError, connection, connections, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path, reverse
+from PIL import Image
+
+from . import routers
+from .cache import PAGES_VERSION_KEY, bump_pages_version, bump_tags_version, shared_timeout
+from .forms import ActivityForm
+from .middleware import QueryBudgetExceeded
+from .counters import rebuild_counters
+from .facets import get_facets
+from .filters import parse_month
+from .images import generate_variants
+from .importers import ActivityImporter
+from .management.commands.stress_database import STRESS_ALIAS, Command as StressDatabaseCommand
+from .models import Activity, ActivityCounter, ActivityTag
+from .proxy import FetchError, ImageProxyCache, UrllibFetcher, url_version
+from .search import search_activities
+from .stats import get_dashboard_stats
+from .synthetic import generate_records
+from .templating import benchmark_templates, project_template_names, warm_templates
+from .urls import build_urlpatterns, urlpatterns
+from .views import SEARCH_PAGE_SIZE
+
+
+@override_settings(QUERY_BUDGET_ACTION='raise')
+class ActivityTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+
+
+def create_activity(**kwargs):
+    data = {
+        'title': 'Curso de Django',
+        'description': 'Descrição detalhada da atividade de teste.',
+        'type': 'COURSE',
+        'status': 'PENDING',
+        'start_date': date.today(),
+        'end_date': date.today() + timedelta(days=7),
+        'location': 'Laboratório de Informática 1',
+        'coordinator': 'Prof. João Silva',
+        'participants': 10,
+    }
+    data.update(kwargs)
+    return Activity.objects.create(**data)
+
+
+def create_activities(count, tags_per_activity=5):
+    tags = [ActivityTag.objects.get_or_create(name=f'tag {i}')[0] for i in range(tags_per_activity)]
+    activities = []
+    for i in range(count):
+        activity = create_activity(title=f'Atividade {i:03d}')
+        activity.tags.set(tags)
+        activities.append(activity)
+    return activities
+
+
+class ActivityListQueryCountTests(ActivityTestCase):
+    """Garante que as páginas de listagem não fazem uma consulta por card"""
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_list_query_count_is_constant(self):
+        create_activities(2)
+        small_page = self.count_queries(reverse('activity_list'))
+        create_activities(10)
+        full_page = self.count_queries(reverse('activity_list'))
+        self.assertEqual(small_page, full_page)
+        # validadores do ETag, COUNT da paginação, página, prefetch das tags,
+        # contadores e facetas (estes dois ficam no cache até a próxima mudança)
+        self.assertLessEqual(full_page, 6)
+        self.assertEqual(self.count_queries(reverse('activity_list') + '?view=list'), full_page - 2)
+
+    def test_search_query_count_is_constant(self):
+        create_activities(2)
+        small_page = self.count_queries(reverse('search'))
+        create_activities(10)
+        full_page = self.count_queries(reverse('search'))
+        self.assertEqual(small_page, full_page)
+
+    def test_list_shows_tag_preview(self):
+        create_activities(1, tags_per_activity=5)
+        response = self.client.get(reverse('activity_list'))
+        self.assertContains(response, 'tag 0')
+        # 'tag 4' só aparece nas facetas, não no card
+        self.assertContains(response, 'tag 4', count=1)
+        self.assertContains(response, '+2')
+
+
+class SearchPaginationTests(ActivityTestCase):
+    def test_search_is_bounded(self):
+        create_activities(15, tags_per_activity=1)
+        response = self.client.get(reverse('search'))
+        self.assertEqual(len(response.context['activities']), 12)
+        self.assertTrue(response.context['page'].has_next())
+
+    def test_cursor_walks_all_results_without_duplicates(self):
+        # Mesmo created_at em todas as linhas força o desempate pelo id
+        create_activities(30, tags_per_activity=1)
+        Activity.objects.update(created_at=Activity.objects.first().created_at)
+        seen = []
+        cursor = None
+        while True:
+            response = self.client.get(reverse('search'), {'cursor': cursor} if cursor else {})
+            page = response.context['page']
+            seen.extend(activity.pk for activity in page)
+            if not page.has_next():
+                break
+            cursor = page.next_cursor
+        self.assertEqual(seen, list(Activity.objects.order_by('-created_at', '-pk').values_list('pk', flat=True)))
+
+        response = self.client.get(reverse('search'), {'cursor': cursor})
+        previous = self.client.get(reverse('search'), {'cursor': response.context['page'].previous_cursor})
+        self.assertEqual([a.pk for a in previous.context['page']], seen[12:24])
+
+    def test_search_term_pages_by_relevance(self):
+        # Empates de relevância (mesmo texto) são desempatados pelo id
+        in_title = [create_activity(title=f'Robótica {i}') for i in range(15)]
+        for i in range(15):
+            create_activity(title=f'Oficina {i}', description='Montagem de kits de robótica.')
+        params = {'search': 'robotica'}
+        seen, pages = [], []
+        while True:
+            response = self.client.get(reverse('search'), params)
+            page = response.context['page']
+            pages.append([activity.pk for activity in page])
+            seen.extend(pages[-1])
+            if not page.has_next():
+                break
+            params = {'search': 'robotica', 'cursor': page.next_cursor}
+        expected = search_activities(Activity.objects.all(), 'robotica', ranked=True).order_by('-search_rank', '-pk')
+        self.assertEqual(seen, list(expected.values_list('pk', flat=True)))
+        self.assertEqual(set(seen[:15]), {activity.pk for activity in in_title})
+
+        response = self.client.get(reverse('search'), {'search': 'robotica', 'cursor': page.previous_cursor})
+        self.assertEqual([activity.pk for activity in response.context['page']], pages[-2])
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        create_activities(3, tags_per_activity=1)
+        response = self.client.get(reverse('search'), {'cursor': 'forjado'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['activities']), 3)
+
+
+class SearchIndexTests(ActivityTestCase):
+    def search(self, term, ranked=False):
+        return list(search_activities(Activity.objects.all(), term, ranked=ranked))
+
+    def test_prefix_and_accent_insensitive_match(self):
+        activity = create_activity(title='Projeto de Extensão em Programação')
+        self.assertEqual(self.search('extensao'), [activity])
+        self.assertEqual(self.search('PROGRAM'), [activity])
+        self.assertEqual(self.search('program inexistente'), [])
+
+    def test_index_follows_updates_and_deletes(self):
+        activity = create_activity(title='Seminário de Física')
+        activity.title = 'Seminário de Química'
+        activity.save()
+        self.assertEqual(self.search('fisica'), [])
+        self.assertEqual(self.search('quimica'), [activity])
+        activity.delete()
+        self.assertEqual(self.search('quimica'), [])
+
+    def test_index_follows_tag_changes(self):
+        activity = create_activity()
+        tag = ActivityTag.objects.create(name='robótica')
+        activity.tags.add(tag)
+        self.assertEqual(self.search('robotica'), [activity])
+        tag.name = 'astronomia'
+        tag.save()
+        self.assertEqual(self.search('robotica'), [])
+        self.assertEqual(self.search('astro'), [activity])
+        tag.activities.clear()
+        self.assertEqual(self.search('astro'), [])
+
+    def test_ranking_prefers_title_matches(self):
+        in_description = create_activity(title='Oficina', description='Introdução prática ao Django.')
+        in_title = create_activity(title='Django avançado')
+        ranked = list(
+            search_activities(Activity.objects.all(), 'django', ranked=True).order_by('-search_rank')
+        )
+        self.assertEqual(ranked, [in_title, in_description])
+
+    def test_list_and_search_views_use_index(self):
+        create_activity(title='Curso de Extensão')
+        create_activity(title='Workshop de Redes')
+        for url in (reverse('activity_list'), reverse('search')):
+            response = self.client.get(url, {'search': 'extensao'})
+            self.assertEqual([a.title for a in response.context['activities']], ['Curso de Extensão'])
+
+    def test_punctuation_only_term_finds_nothing(self):
+        create_activity()
+        self.assertEqual(self.search('"', ranked=True), [])
+        for url in (reverse('activity_list'), reverse('search'), reverse('activity_export')):
+            response = self.client.get(url, {'search': '"'})
+            self.assertEqual(response.status_code, 200, url)
+
+
+class FilterTests(ActivityTestCase):
+    def test_invalid_dates_are_ignored(self):
+        create_activity(start_date=date(2025, 3, 10))
+        for url in (reverse('activity_list'), reverse('search'), reverse('activity_export')):
+            for value in ('foo', '2025-02-30'):
+                response = self.client.get(url, {'start_date': value, 'end_date': value})
+                self.assertEqual(response.status_code, 200, (url, value))
+        response = self.client.get(reverse('search'), {'start_date': 'foo', 'end_date': '2025-03-31'})
+        self.assertEqual(len(response.context['activities']), 1)
+
+
+class DashboardStatsTests(ActivityTestCase):
+    def test_stats_use_single_aggregate_and_cache(self):
+        create_activity(status='PENDING', type='COURSE')
+        create_activity(status='IN_PROGRESS', type='WORKSHOP')
+        create_activity(status='COMPLETED', type='WORKSHOP')
+        with self.assertNumQueries(2):
+            stats = get_dashboard_stats()
+        self.assertEqual(stats['total_activities'], 3)
+        self.assertEqual(stats['upcoming_activities'], 1)
+        self.assertEqual(stats['active_activities'], 1)
+        self.assertEqual(stats['completed_activities'], 1)
+        self.assertEqual(stats['activities_by_type'], [
+            {'type': 'COURSE', 'count': 1},
+            {'type': 'WORKSHOP', 'count': 2},
+        ])
+        with self.assertNumQueries(0):
+            get_dashboard_stats()
+
+    def test_warm_dashboard_costs_at_most_one_query(self):
+        create_activity()
+        self.client.get(reverse('dashboard'))
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(len(ctx.captured_queries), 1)
+
+    def test_cache_is_invalidated_on_save_and_delete(self):
+        activity = create_activity(status='PENDING')
+        self.assertEqual(get_dashboard_stats()['upcoming_activities'], 1)
+        activity.status = 'COMPLETED'
+        activity.save()
+        self.assertEqual(get_dashboard_stats()['completed_activities'], 1)
+        activity.delete()
+        self.assertEqual(get_dashboard_stats()['total_activities'], 0)
+
+
+class PublicPageCacheTests(ActivityTestCase):
+    def test_list_is_served_from_cache_until_activity_changes(self):
+        activity = create_activity(title='Curso de Django')
+        self.client.get(reverse('activity_list'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('activity_list'))
+        self.assertContains(response, 'Curso de Django')
+
+        activity.title = 'Curso de Flask'
+        activity.save()
+        self.assertContains(self.client.get(reverse('activity_list')), 'Curso de Flask')
+
+    def test_requirement_and_tag_changes_invalidate_detail(self):
+        activity = create_activity()
+        url = reverse('activity_detail', args=[activity.pk])
+        self.client.get(url)
+        activity.requirements.create(requirement='Notebook próprio')
+        self.assertContains(self.client.get(url), 'Notebook próprio')
+        activity.tags.add(ActivityTag.objects.create(name='python'))
+        self.assertContains(self.client.get(url), '#python')
+
+    def test_querystring_is_normalized(self):
+        create_activity(type='COURSE', status='PENDING')
+        self.client.get(reverse('activity_list'), {'type': 'COURSE', 'status': 'PENDING', 'search': ''})
+        with self.assertNumQueries(0):
+            self.client.get(reverse('activity_list') + '?status=PENDING&type=COURSE')
+
+    def test_accessibility_preferences_are_part_of_the_key(self):
+        create_activity()
+        self.client.get(reverse('dashboard'))
+        response = self.client.get(reverse('dashboard'), {'contrast': 'high'})
+        self.assertContains(response, 'high-contrast')
+        response = self.client.get(reverse('dashboard'))
+        self.assertContains(response, 'high-contrast')
+
+    def test_pages_with_pending_messages_are_not_cached(self):
+        self.client.get(reverse('activity_list'))
+        self.client.post(reverse('activity_create'), {
+            'title': 'Nova atividade', 'type': 'COURSE', 'status': 'PENDING',
+            'description': 'Descrição da nova atividade.', 'start_date': '2026-01-10',
+            'end_date': '2026-01-12', 'location': 'Bloco 1', 'coordinator': 'Profa. Ana',
+            'participants': 5, 'tags': 'python',
+        })
+        response = self.client.get(reverse('activity_list'))
+        self.assertContains(response, 'Atividade criada com sucesso!')
+        self.assertContains(response, 'Nova atividade')
+        self.assertNotContains(self.client.get(reverse('activity_list')), 'Atividade criada com sucesso!')
+
+
+class AccessibilityPreferencesTests(ActivityTestCase):
+    def test_preferences_are_kept_in_a_signed_cookie(self):
+        response = self.client.get(reverse('dashboard'), {'font_size': 'large', 'dyslexia': 'true'})
+        self.assertIn('a11y', response.cookies)
+        self.assertNotIn('sessionid', response.cookies)
+        response = self.client.get(reverse('dashboard'))
+        self.assertContains(response, 'data-font-size="large"')
+        self.assertContains(response, 'dyslexic-font')
+
+    def test_cookie_is_only_written_when_preferences_change(self):
+        self.assertNotIn('a11y', self.client.get(reverse('dashboard')).cookies)
+        self.client.get(reverse('dashboard'), {'contrast': 'high'})
+        self.assertNotIn('a11y', self.client.get(reverse('dashboard'), {'contrast': 'high'}).cookies)
+
+    def test_pages_do_not_touch_the_session_table(self):
+        activity = create_activity()
+        self.client.get(reverse('dashboard'), {'contrast': 'high'})
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse('activity_detail', args=[activity.pk]))
+        self.assertFalse([q for q in ctx.captured_queries if 'django_session' in q['sql']])
+
+    def test_tampered_cookie_falls_back_to_defaults(self):
+        self.client.cookies['a11y'] = 'larger|high|1'
+        response = self.client.get(reverse('dashboard'))
+        self.assertContains(response, 'data-font-size="normal"')
+
+
+class ConditionalGetTests(ActivityTestCase):
+    def test_detail_returns_304_until_modified(self):
+        activity = create_activity()
+        url = reverse('activity_detail', args=[activity.pk])
+        response = self.client.get(url)
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+        etag = response['ETag']
+        activity.tags.add(ActivityTag.objects.create(name='python'))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_list_etag_depends_on_filters_and_deletions(self):
+        create_activity(type='COURSE')
+        workshop = create_activity(type='WORKSHOP')
+        url = reverse('activity_list')
+        etag = self.client.get(url)['ETag']
+        self.assertNotEqual(etag, self.client.get(url, {'type': 'COURSE'})['ETag'])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        workshop.delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_if_modified_since(self):
+        activity = create_activity()
+        url = reverse('activity_detail', args=[activity.pk])
+        last_modified = self.client.get(url)['Last-Modified']
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+
+class QueryPlanTests(ActivityTestCase):
+    def test_view_querysets_do_not_scan_the_table(self):
+        call_command('generate_activities', count=200, tags_per_activity=3, seed=1, stdout=StringIO())
+        out = StringIO()
+        call_command('check_query_plans', verbosity=2, stdout=out)
+        for name in ('activity_list (página)', 'search', 'facetas', 'activity_list (validadores)'):
+            self.assertIn(name, out.getvalue())
+
+    def test_plans_with_table_statistics(self):
+        # Com estatísticas (ANALYZE) o SQLite sabe que tipo e status têm poucos valores
+        # e troca de plano; nenhum deles pode ser uma varredura da tabela
+        call_command('generate_activities', count=200, tags_per_activity=3, seed=1, stdout=StringIO())
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        call_command('check_query_plans', stdout=StringIO())
+
+
+class ActivityFormTagTests(ActivityTestCase):
+    def form_data(self, tags):
+        return {
+            'title': 'Curso de Django', 'type': 'COURSE', 'status': 'PENDING',
+            'description': 'Descrição detalhada da atividade.', 'start_date': '2026-01-10',
+            'end_date': '2026-01-12', 'location': 'Bloco 1', 'coordinator': 'Profa. Ana',
+            'participants': 5, 'tags': tags,
+        }
+
+    def save_form(self, tags, instance=None):
+        form = ActivityForm(self.form_data(tags), instance=instance)
+        self.assertTrue(form.is_valid(), form.errors)
+        return form.save()
+
+    def test_tags_are_normalized_and_deduplicated(self):
+        ActivityTag.objects.create(name='python')
+        activity = self.save_form('Python,  python , Machine   Learning,')
+        self.assertEqual(sorted(activity.tags.values_list('name', flat=True)), ['machine learning', 'python'])
+        self.assertEqual(ActivityTag.objects.count(), 2)
+
+    def test_tag_saving_cost_does_not_grow_with_tag_count(self):
+        activity = self.save_form('a, b')
+        with CaptureQueriesContext(connection) as few:
+            self.save_form(', '.join(f'nova {i}' for i in range(2)), instance=activity)
+        with CaptureQueriesContext(connection) as many:
+            self.save_form(', '.join(f'outra {i}' for i in range(15)), instance=activity)
+        self.assertEqual(len(few), len(many))
+        self.assertEqual(activity.tags.count(), 15)
+
+    def test_rejects_tags_longer_than_the_column(self):
+        form = ActivityForm(self.form_data('x' * 51))
+        self.assertFalse(form.is_valid())
+        self.assertIn('tags', form.errors)
+
+
+class ActivityApiTests(ActivityTestCase):
+    def test_list_supports_filters_and_sparse_fields(self):
+        course = create_activity(type='COURSE')
+        course.tags.add(ActivityTag.objects.create(name='python'))
+        create_activity(type='WORKSHOP')
+        response = self.client.get(reverse('api_activity_list'), {'type': 'COURSE', 'fields': 'id,title,tags'})
+        self.assertEqual(response.json()['results'], [{'id': course.pk, 'title': course.title, 'tags': ['python']}])
+
+    def test_unknown_fields_and_bad_dates_are_rejected(self):
+        url = reverse('api_activity_list')
+        self.assertEqual(self.client.get(url, {'fields': 'title,senha'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'start_date': 'ontem'}).status_code, 400)
+
+    def test_cursor_pagination(self):
+        create_activities(5, tags_per_activity=1)
+        response = self.client.get(reverse('api_activity_list'), {'limit': 3, 'fields': 'id'}).json()
+        self.assertEqual(len(response['results']), 3)
+        self.assertIsNone(response['previous'])
+        second = self.client.get(response['next']).json()
+        self.assertEqual(len(second['results']), 2)
+        self.assertIsNone(second['next'])
+
+    def test_invalid_cursor_is_rejected(self):
+        create_activities(3, tags_per_activity=1)
+        first = self.client.get(reverse('api_activity_list'), {'limit': 2}).json()
+        cursor = parse_qs(urlparse(first['next']).query)['cursor'][0]
+        self.assertEqual(self.client.get(reverse('api_activity_list'), {'cursor': cursor}).status_code, 200)
+        for value in ('forjado', cursor[:-2] + 'xx'):
+            response = self.client.get(reverse('api_activity_list'), {'cursor': value})
+            self.assertEqual(response.status_code, 400, value)
+            self.assertEqual(response.json(), {'error': 'cursor inválido'})
+
+    def test_ndjson_export_streams_every_activity(self):
+        create_activities(3, tags_per_activity=2)
+        response = self.client.get(reverse('api_activity_list'), {'format': 'ndjson', 'fields': 'title,tags'})
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(json.loads(lines[0])['tags'], ['tag 0', 'tag 1'])
+
+    def test_detail(self):
+        activity = create_activity()
+        activity.requirements.create(requirement='Notebook próprio')
+        data = self.client.get(reverse('api_activity_detail', args=[activity.pk])).json()
+        self.assertEqual(data['requirements'], ['Notebook próprio'])
+        self.assertEqual(data['start_date'], activity.start_date.isoformat())
+        self.assertEqual(self.client.get(reverse('api_activity_detail', args=[0])).status_code, 404)
+
+
+class ActivityExportTests(ActivityTestCase):
+    def export(self, **params):
+        response = self.client.get(reverse('activity_export'), params)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content)
+
+    def test_csv_export_uses_list_filters(self):
+        course = create_activity(title='Curso de Django', type='COURSE')
+        course.tags.add(ActivityTag.objects.create(name='python'))
+        create_activity(title='Workshop de Redes', type='WORKSHOP')
+        response, content = self.export(format='csv', type='COURSE')
+        self.assertIn('attachment;', response['Content-Disposition'])
+        rows = list(csv.reader(content.decode('utf-8-sig').splitlines()))
+        self.assertEqual(rows[0][0], 'Título')
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][0], 'Curso de Django')
+        self.assertEqual(rows[1][-2], 'python')
+
+    def test_csv_cells_cannot_start_a_formula(self):
+        create_activity(title='=HYPERLINK("http://example.com")', coordinator='@Prof', location='-1+2')
+        response, content = self.export(format='csv')
+        row = list(csv.reader(content.decode('utf-8-sig').splitlines()))[1]
+        self.assertEqual(row[0], "'=HYPERLINK(\"http://example.com\")")
+        self.assertEqual(row[6], "'-1+2")
+        self.assertEqual(row[7], "'@Prof")
+        self.assertEqual(row[8], '10')
+
+    def test_xlsx_export_is_a_valid_workbook(self):
+        create_activities(3, tags_per_activity=2)
+        response, content = self.export(format='xlsx')
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            self.assertIsNone(archive.testzip())
+            sheet = archive.read('xl/worksheets/sheet1.xml').decode()
+        self.assertEqual(sheet.count('<row '), 4)
+        self.assertIn('Atividade 000', sheet)
+
+    def test_unknown_format(self):
+        self.assertEqual(self.client.get(reverse('activity_export'), {'format': 'pdf'}).status_code, 404)
+
+
+class ImportActivitiesTests(ActivityTestCase):
+    CSV = (
+        'title,description,type,status,start_date,end_date,location,coordinator,participants,tags,requirements\n'
+        'Curso de Django,Descrição detalhada do curso.,COURSE,PENDING,2026-03-01,2026-03-30,Lab 1,Prof. Ana,20,'
+        '"Python, Web",Notebook|Python básico\n'
+        'Workshop de Redes,Descrição detalhada do workshop.,WORKSHOP,ACTIVE,2026-04-01,2026-04-02,Lab 2,Prof. Bia,15,'
+        'redes,\n'
+        'Inválida,Curta,COURSE,PENDING,2026-05-10,2026-05-01,Lab 3,Prof. Caio,5,,\n'
+    )
+
+    def import_file(self, content, suffix='.csv', *args):
+        with tempfile.NamedTemporaryFile('w', suffix=suffix, encoding='utf-8') as handle:
+            handle.write(content)
+            handle.flush()
+            out, err = StringIO(), StringIO()
+            call_command('import_activities', handle.name, *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_csv_import(self):
+        out, err = self.import_file(self.CSV)
+        self.assertIn('2 criadas', out)
+        self.assertIn('Registro 3', err)
+        course = Activity.objects.get(title='Curso de Django')
+        self.assertEqual(sorted(tag.name for tag in course.tags.all()), ['python', 'web'])
+        self.assertEqual(course.requirements.count(), 2)
+        self.assertEqual(list(search_activities(Activity.objects.all(), 'redes')), [
+            Activity.objects.get(title='Workshop de Redes')
+        ])
+
+    def test_reimport_updates_by_natural_key(self):
+        self.import_file(self.CSV)
+        changed = self.CSV.replace('Lab 1,Prof. Ana,20,"Python, Web"', 'Lab 9,Prof. Ana,30,"django"')
+        out, _ = self.import_file(changed)
+        self.assertIn('0 criadas, 2 atualizadas', out)
+        course = Activity.objects.get(title='Curso de Django')
+        self.assertEqual((course.location, course.participants), ('Lab 9', 30))
+        self.assertEqual([tag.name for tag in course.tags.all()], ['django'])
+        self.assertEqual(course.requirements.count(), 2)
+        self.assertEqual(Activity.objects.count(), 2)
+
+    def test_json_lines_and_array(self):
+        record = {
+            'title': 'Seminário de IA', 'description': 'Descrição detalhada do seminário.',
+            'type': 'SEMINAR', 'start_date': '2026-06-01', 'end_date': '2026-06-01',
+            'location': 'Auditório', 'coordinator': 'Prof. Davi', 'tags': ['ia'], 'requirements': ['Nenhum'],
+        }
+        self.import_file(json.dumps(record) + '\n', '.jsonl')
+        out, _ = self.import_file(json.dumps([record, dict(record, title='Seminário de Dados')]), '.json')
+        self.assertIn('1 criadas, 1 atualizadas', out)
+        self.assertEqual(Activity.objects.count(), 2)
+
+    def test_dry_run_writes_nothing(self):
+        out, _ = self.import_file(self.CSV, '.csv', '--dry-run')
+        self.assertIn('2 criadas', out)
+        self.assertFalse(Activity.objects.exists())
+        self.assertFalse(ActivityTag.objects.exists())
+
+    def test_batched_import_query_count_is_constant(self):
+        rows = [
+            f'Atividade {i},Descrição detalhada da atividade.,COURSE,PENDING,2026-03-01,2026-03-02,Lab,Prof,5,"a, b",x|y'
+            for i in range(200)
+        ]
+        header = self.CSV.splitlines()[0]
+        with CaptureQueriesContext(connection) as small:
+            self.import_file('\n'.join([header] + rows[:20]), '.csv', '--batch-size', '500')
+        with CaptureQueriesContext(connection) as large:
+            self.import_file('\n'.join([header] + rows[20:]), '.csv', '--batch-size', '500')
+        self.assertEqual(Activity.objects.count(), 200)
+        # o número de consultas depende dos lotes, não da quantidade de linhas
+        self.assertLess(len(large.captured_queries), len(small.captured_queries) + 5)
+
+    def test_reimport_does_not_write_per_row(self):
+        rows = [
+            f'Atividade {i},Descrição detalhada da atividade.,COURSE,PENDING,2026-03-01,2026-03-02,Lab,Prof,5,a,x|y'
+            for i in range(50)
+        ]
+        content = '\n'.join([self.CSV.splitlines()[0]] + rows)
+        self.import_file(content)
+        with CaptureQueriesContext(connection) as ctx:
+            out, _ = self.import_file(content)
+        self.assertIn('50 atualizadas', out)
+        self.assertLess(len(ctx.captured_queries), 20)
+
+
+class SyntheticDataAndBenchmarkTests(ActivityTestCase):
+    def test_generate_activities(self):
+        call_command('generate_activities', count=30, tags_per_activity=3, seed=1, stdout=StringIO())
+        self.assertEqual(Activity.objects.count(), 30)
+        self.assertTrue(ActivityTag.objects.exists())
+        activity = Activity.objects.first()
+        self.assertEqual(activity.requirements.count(), 2)
+        self.assertLessEqual(activity.tags.count(), 3)
+
+    def test_generated_data_is_deterministic(self):
+        self.assertEqual(list(generate_records(5, seed=42)), list(generate_records(5, seed=42)))
+
+    def test_benchmark_report_covers_every_url(self):
+        create_activities(3)
+        out = StringIO()
+        call_command('benchmark', iterations=2, output='-', stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual(report['activities'], 3)
+        for pattern in urlpatterns:
+            result = report['results'][pattern.name]
+            if pattern.name == 'activity_image_proxy':
+                # As atividades de teste não têm image_url
+                self.assertEqual(result['status'], 404)
+                continue
+            self.assertEqual(result['status'], 200, pattern.name)
+            self.assertGreaterEqual(result['p95_ms'], result['p50_ms'])
+            self.assertGreater(result['peak_memory_kb'], 0)
+
+
+class InstrumentationMiddlewareTests(ActivityTestCase):
+    def test_server_timing_header(self):
+        create_activities(3)
+        response = self.client.get(reverse('activity_list'))
+        timing = response['Server-Timing']
+        for metric in ('db;', 'view;', 'tpl;', 'total;'):
+            self.assertIn(metric, timing)
+        self.assertIn('6 consultas', timing)
+
+    def test_structured_log_line(self):
+        activity = create_activity()
+        with self.assertLogs('activities.middleware', level='INFO') as logs:
+            self.client.get(reverse('activity_detail', args=[activity.pk]))
+        data = json.loads(logs.records[0].getMessage())
+        self.assertEqual(data['url_name'], 'activity_detail')
+        self.assertEqual(data['status'], 200)
+        self.assertGreater(data['queries'], 0)
+        self.assertGreater(data['template_ms'], 0)
+
+    def test_query_budget(self):
+        create_activities(3)
+        with override_settings(QUERY_BUDGETS={'activity_list': 1}):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(reverse('activity_list'))
+            cache.clear()
+            with override_settings(QUERY_BUDGET_ACTION='log'), \
+                    self.assertLogs('activities.middleware', level='WARNING'):
+                self.assertEqual(self.client.get(reverse('activity_list')).status_code, 200)
+
+
+class FakeRedis:
+    """
+    Dublê em memória do cliente redis-py, com os comandos que o RedisCacheClient
+    do Django usa. Como no Redis, inteiros são guardados como texto (é assim
+    que o incr funciona) e o resto como os bytes do pickle.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+
+    def _alive(self, key):
+        expires = self.expires.get(key)
+        if expires is not None and expires <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    def get(self, key):
+        return self.data[key] if self._alive(key) else None
+
+    def mget(self, keys):
+        return [self.get(key) for key in keys]
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and self._alive(key):
+            return None
+        self.data[key] = str(value).encode() if isinstance(value, int) else value
+        self.expires.pop(key, None)
+        if ex is not None:
+            self.expire(key, ex)
+        return True
+
+    def mset(self, mapping):
+        for key, value in mapping.items():
+            self.set(key, value)
+        return True
+
+    def expire(self, key, seconds):
+        if not self._alive(key):
+            return False
+        self.expires[key] = time.monotonic() + seconds
+        return True
+
+    def persist(self, key):
+        return self._alive(key) and self.expires.pop(key, None) is not None
+
+    def exists(self, *keys):
+        return sum(self._alive(key) for key in keys)
+
+    def delete(self, *keys):
+        deleted = [key for key in keys if self._alive(key)]
+        for key in deleted:
+            del self.data[key]
+            self.expires.pop(key, None)
+        return len(deleted)
+
+    def incr(self, key, amount=1):
+        # Como no Redis, o incr mantém o prazo de expiração da chave
+        value = int(self.get(key) or 0) + amount
+        self.data[key] = str(value).encode()
+        return value
+
+    def flushdb(self):
+        self.data.clear()
+        self.expires.clear()
+        return True
+
+    def pipeline(self):
+        return FakeRedisPipeline(self)
+
+
+class FakeRedisPipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    def execute(self):
+        return [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+
+
+class FakeRedisCacheClient(RedisCacheClient):
+    """RedisCacheClient que fala com o FakeRedis em vez de abrir conexões"""
+
+    def __init__(self, servers, **options):
+        self._servers = servers
+        self._serializer = RedisSerializer()
+        self._fake = FakeRedis()
+
+    def get_client(self, key=None, *, write=False):
+        return self._fake
+
+
+class FakeRedisCache(RedisCache):
+    """O backend Redis do Django inteiro, só que sobre o FakeRedis (não precisa do pacote redis)"""
+
+    def __init__(self, server, params):
+        super().__init__(server, params)
+        self._class = FakeRedisCacheClient
+
+
+FAKE_REDIS_CACHES = {
+    'default': {'BACKEND': f'{__name__}.FakeRedisCache', 'LOCATION': 'redis://stand-in:6379/1'},
+}
+
+
+class SessionAndCacheBackendTests(ActivityTestCase):
+    def test_sessions_use_cached_db_only_with_a_shared_cache(self):
+        shared = settings.CACHE_BACKEND in ('file', 'redis')
+        self.assertEqual(settings.SESSION_ENGINE.endswith('.cached_db'), shared)
+
+    @override_settings(CACHES=FAKE_REDIS_CACHES, SESSION_ENGINE='django.contrib.sessions.backends.cached_db')
+    def test_cached_db_sessions_are_read_from_the_cache(self):
+        engine = import_module(settings.SESSION_ENGINE)
+        session = engine.SessionStore()
+        session['font_size'] = 'large'
+        session.create()
+        with self.assertNumQueries(0):
+            self.assertEqual(engine.SessionStore(session_key=session.session_key)['font_size'], 'large')
+
+    def check_redis_cache(self, redis_cache):
+        redis_cache.set(PAGES_VERSION_KEY, 1)
+        redis_cache.incr(PAGES_VERSION_KEY)
+        self.assertEqual(redis_cache.get(PAGES_VERSION_KEY), 2)
+        self.assertTrue(redis_cache.add('ufc:novo', {'a': 1}, 60))
+        self.assertFalse(redis_cache.add('ufc:novo', {'a': 2}, 60))
+        redis_cache.set_many({'ufc:x': 'x', 'ufc:y': [1, 2]}, 60)
+        self.assertEqual(redis_cache.get_many(['ufc:x', 'ufc:y', 'ufc:z']), {'ufc:x': 'x', 'ufc:y': [1, 2]})
+        redis_cache.delete_many([PAGES_VERSION_KEY, 'ufc:novo', 'ufc:x', 'ufc:y'])
+        self.assertIsNone(redis_cache.get(PAGES_VERSION_KEY))
+
+    def test_redis_cache_backend_against_stand_in(self):
+        self.check_redis_cache(FakeRedisCache('redis://stand-in:6379/1', {'KEY_PREFIX': 'ufc-activities-tests'}))
+
+    @override_settings(CACHES=FAKE_REDIS_CACHES)
+    def test_pages_are_cached_in_redis(self):
+        create_activity(title='Atividade no Redis')
+        self.assertContains(self.client.get(reverse('activity_list')), 'Atividade no Redis')
+        with self.assertNumQueries(0):
+            self.assertContains(self.client.get(reverse('activity_list')), 'Atividade no Redis')
+        create_activity(title='Outra atividade')
+        self.assertContains(self.client.get(reverse('activity_list')), 'Outra atividade')
+
+    @skipUnless(os.environ.get('REDIS_URL'), 'defina REDIS_URL para testar contra um servidor Redis de verdade')
+    def test_redis_cache_backend(self):
+        self.check_redis_cache(RedisCache(os.environ['REDIS_URL'], {'KEY_PREFIX': 'ufc-activities-tests'}))
+
+
+class DatabaseTuningTests(ActivityTestCase):
+    def test_stress_command_runs_with_configured_options(self):
+        out = StringIO()
+        call_command('stress_database', readers=2, writers=2, duration=0.3, hold=0, compare=True, stdout=out)
+        configured, default = out.getvalue().splitlines()
+        self.assertTrue(configured.startswith('configurado:'))
+        self.assertIn(' 0 erros', configured)
+        self.assertTrue(default.startswith('padrão:'))
+
+    def read_during_write(self, options):
+        """
+        Soma dos valores lida por outra conexão enquanto uma transação de
+        escrita segura o lock exclusivo, e o tempo da leitura em ms.
+        """
+        command = StressDatabaseCommand()
+        with tempfile.TemporaryDirectory() as directory:
+            settings_dict = {
+                **connection.settings_dict, 'NAME': os.path.join(directory, 'stress.sqlite3'),
+                # EXCLUSIVE: o lock que a escrita pega no commit; timeout curto para um leitor bloqueado
+                'OPTIONS': {**options, 'transaction_mode': 'EXCLUSIVE', 'timeout': 0.5},
+            }
+            command.setup_database(settings_dict)
+            result = {}
+
+            def reader():
+                wrapper = command.connect(settings_dict)
+                try:
+                    started = time.perf_counter()
+                    with wrapper.cursor() as cursor:
+                        cursor.execute('SELECT SUM(value) FROM stress')
+                        result['sum'] = cursor.fetchone()[0]
+                    result['ms'] = (time.perf_counter() - started) * 1000
+                except OperationalError as exc:
+                    result['error'] = str(exc)
+                finally:
+                    command.disconnect(wrapper)
+
+            writer = command.connect(settings_dict)
+            try:
+                with transaction.atomic(using=STRESS_ALIAS):
+                    with writer.cursor() as cursor:
+                        cursor.execute('UPDATE stress SET value = 1')
+                    thread = threading.Thread(target=reader)
+                    thread.start()
+                    thread.join()
+            finally:
+                command.disconnect(writer)
+        return result
+
+    def test_readers_do_not_wait_for_an_open_write_transaction(self):
+        result = self.read_during_write(settings.DATABASES['default']['OPTIONS'])
+        # A leitura não esperou o commit e viu os dados anteriores à escrita
+        self.assertEqual(result['sum'], 0)
+        self.assertLess(result['ms'], 250)
+        # Sem WAL (journal DELETE, o padrão do SQLite) o mesmo leitor fica bloqueado
+        self.assertEqual(self.read_during_write({}), {'error': 'database is locked'})
+
+    def test_sqlite_options(self):
+        options = settings.DATABASES['default']['OPTIONS']
+        self.assertIn('journal_mode=WAL', options['init_command'])
+        self.assertEqual(options['transaction_mode'], 'IMMEDIATE')
+
+
+@override_settings(REPLICA_DATABASES=['replica'])
+class ReplicaRoutingTests(ActivityTestCase):
+    """Usa um segundo arquivo SQLite como "réplica" (sem replicação: os dados diferem de propósito)"""
+
+    # '__all__' inclui a réplica registrada em setUpClass
+    databases = '__all__'
+
+    @classmethod
+    def setUpClass(cls):
+        cls.replica_dir = tempfile.TemporaryDirectory()
+        replica = {**connections.settings['default'], 'NAME': os.path.join(cls.replica_dir.name, 'replica.sqlite3')}
+        connections.settings['replica'] = replica
+        call_command('migrate', database='replica', verbosity=0)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['replica'].close()
+        del connections['replica']
+        del connections.settings['replica']
+        cls.replica_dir.cleanup()
+
+    def setUp(self):
+        super().setUp()
+        create_activity(title='Atividade no principal')
+        Activity.objects.using('replica').create(
+            title='Atividade na réplica', description='Descrição detalhada da atividade.',
+            start_date=date.today(), end_date=date.today(), location='Lab', coordinator='Prof', participants=1,
+        )
+
+    def test_public_pages_read_from_the_replica(self):
+        response = self.client.get(reverse('activity_list'))
+        self.assertContains(response, 'Atividade na réplica')
+        self.assertNotContains(response, 'Atividade no principal')
+
+    def test_other_views_read_from_the_primary(self):
+        activity = Activity.objects.get(title='Atividade no principal')
+        self.assertContains(self.client.get(reverse('activity_update', args=[activity.pk])), 'Atividade no principal')
+
+    @override_settings(REPLICA_DATABASES=[])
+    def test_without_replicas_everything_uses_the_primary(self):
+        self.assertContains(self.client.get(reverse('activity_list')), 'Atividade no principal')
+
+    def test_read_your_writes_after_creating(self):
+        response = self.client.post(reverse('activity_create'), {
+            'title': 'Nova atividade', 'type': 'COURSE', 'status': 'PENDING',
+            'description': 'Descrição da nova atividade.', 'start_date': '2026-01-10',
+            'end_date': '2026-01-12', 'location': 'Bloco 1', 'coordinator': 'Profa. Ana',
+            'participants': 5, 'tags': 'python',
+        })
+        self.assertIn('pin_primary', response.cookies)
+        pin = self.client.cookies.pop('pin_primary')
+
+        # Outro visitante renderiza as páginas (e as facetas) a partir da réplica atrasada...
+        for url in (reverse('activity_list'), reverse('dashboard')):
+            self.assertNotContains(self.client.get(url), 'Nova atividade')
+        # ...mas quem escreveu não recebe essa versão do cache
+        self.client.cookies['pin_primary'] = pin
+        for url in (reverse('activity_list'), reverse('dashboard')):
+            self.assertContains(self.client.get(url), 'Nova atividade')
+
+    def test_replica_renders_are_cached_only_for_the_replica_lag(self):
+        routing, token = routers.start_request()
+        try:
+            routers.use_replica()
+            self.assertEqual(shared_timeout(600), settings.REPLICA_PIN_SECONDS)
+        finally:
+            routers.finish_request(token)
+        self.assertEqual(shared_timeout(600), 600)
+
+
+@override_settings(IMAGE_WORKERS=0)
+class ImageVariantTests(ActivityTestCase):
+    def setUp(self):
+        super().setUp()
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+
+    def upload(self, size=(2400, 1600), color='steelblue'):
+        buffer = io.BytesIO()
+        Image.new('RGB', size, color).save(buffer, 'JPEG')
+        return SimpleUploadedFile('foto.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+    def test_variants_are_generated_after_upload(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            activity = create_activity(image=self.upload())
+        activity.refresh_from_db()
+        variants = activity.image_variants
+        self.assertEqual(variants['source'], activity.image.name)
+        self.assertEqual((variants['card']['width'], variants['card']['height']), (400, 225))
+        self.assertEqual(variants['detail_2x']['width'], 1920)
+        with default_storage.open(variants['card']['webp']) as handle:
+            self.assertEqual(Image.open(handle).format, 'WEBP')
+
+    def test_small_images_are_not_upscaled(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            activity = create_activity(image=self.upload(size=(300, 200)))
+        activity.refresh_from_db()
+        self.assertEqual(activity.image_variants['detail']['width'], 300)
+
+    def test_list_card_uses_srcset(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            create_activity(image=self.upload())
+        response = self.client.get(reverse('activity_list'))
+        self.assertContains(response, 'type="image/webp"')
+        self.assertRegex(response.content.decode(), r'card_2x-[0-9a-f]{12}\.webp 800w')
+        self.assertNotContains(response, 'foto')
+
+    def test_new_upload_gets_new_urls_and_removes_old_files(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            activity = create_activity(image=self.upload())
+        activity.refresh_from_db()
+        old = activity.image_variants
+        with self.captureOnCommitCallbacks(execute=True):
+            activity.image = self.upload(color='tomato')
+            activity.save()
+        activity.refresh_from_db()
+        new = activity.image_variants
+        self.assertNotEqual(new['card']['webp'], old['card']['webp'])
+        self.assertTrue(default_storage.exists(new['card']['webp']))
+        self.assertFalse(default_storage.exists(old['card']['webp']))
+        self.assertFalse(default_storage.exists(old['detail_2x']['jpeg']))
+
+    def test_regenerating_the_same_image_keeps_its_files(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            activity = create_activity(image=self.upload())
+        activity.refresh_from_db()
+        self.assertEqual(generate_variants(activity.pk), activity.image_variants)
+        self.assertTrue(default_storage.exists(activity.image_variants['card']['webp']))
+
+    def test_backfill_command(self):
+        activity = create_activity(image=self.upload())
+        self.assertEqual(Activity.objects.get(pk=activity.pk).image_variants, {})
+        out = StringIO()
+        call_command('generate_image_variants', workers=0, stdout=out)
+        self.assertIn('1 imagens processadas', out.getvalue())
+        self.assertIn('card', Activity.objects.get(pk=activity.pk).image_variants)
+
+
+class ImageHandler(SimpleHTTPRequestHandler):
+    """Servidor local que faz o papel do site externo nas imagens de image_url"""
+
+    requests = 0
+
+    redirects = {
+        '/metadados': 'http://169.254.169.254/latest/meta-data/',
+        '/ftp': 'ftp://10.0.0.1/imagem.png',
+    }
+
+    def do_GET(self):
+        type(self).requests += 1
+        if self.path in self.redirects:
+            self.send_response(302)
+            self.send_header('Location', self.redirects[self.path])
+            self.end_headers()
+            return
+        buffer = io.BytesIO()
+        Image.new('RGB', (1600, 900), 'tomato').save(buffer, 'PNG')
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/png')
+        self.end_headers()
+        self.wfile.write(buffer.getvalue())
+
+    def log_message(self, *args):
+        pass
+
+
+@override_settings(IMAGE_PROXY_ALLOW_PRIVATE_HOSTS=True)
+class ImageProxyTests(ActivityTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), ImageHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.image_url = f'http://127.0.0.1:{cls.server.server_port}/foto.png'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        super().setUp()
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        ImageHandler.requests = 0
+        self.activity = create_activity(image_url=self.image_url)
+
+    def get(self, **params):
+        response = self.client.get(
+            reverse('activity_image_proxy', args=[self.activity.pk]), params, HTTP_ACCEPT='image/webp,*/*',
+        )
+        if response.status_code == 200:
+            response.content_bytes = b''.join(response.streaming_content)
+        return response
+
+    def test_image_is_fetched_once_and_resized(self):
+        version = url_version(self.image_url)
+        response = self.get(w=400, v=version)
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(Image.open(io.BytesIO(response.content_bytes)).size, (400, 225))
+        self.get(w=400, v=version)
+        self.assertEqual(ImageHandler.requests, 1)
+
+    def test_unknown_width_and_fetch_errors(self):
+        self.assertEqual(self.get(w=123).status_code, 400)
+        Activity.objects.filter(pk=self.activity.pk).update(image_url='http://127.0.0.1:1/nada.png')
+        self.assertEqual(self.get(w=400).status_code, 502)
+
+    @override_settings(IMAGE_PROXY_ALLOW_PRIVATE_HOSTS=False)
+    def test_private_hosts_are_rejected(self):
+        self.assertEqual(self.get(w=400).status_code, 502)
+        self.assertEqual(ImageHandler.requests, 0)
+
+    @override_settings(IMAGE_PROXY_ALLOW_PRIVATE_HOSTS=False)
+    def test_redirects_to_private_addresses_are_rejected(self):
+        fetcher = UrllibFetcher()
+        base = self.image_url.rsplit('/', 1)[0]
+        # Só o servidor de teste conta como endereço público
+        with mock.patch('activities.proxy.is_public_address', lambda address: address == '127.0.0.1'):
+            self.assertTrue(fetcher.fetch(self.image_url, 10 ** 7, 5))
+            with self.assertRaisesMessage(FetchError, 'Endereço não permitido'):
+                fetcher.fetch(base + '/metadados', 10 ** 7, 5)
+            with self.assertRaisesMessage(FetchError, 'Redirecionamento não permitido'):
+                fetcher.fetch(base + '/ftp', 10 ** 7, 5)
+        self.assertEqual(ImageHandler.requests, 3)
+
+    def test_lru_eviction(self):
+        proxy_cache = ImageProxyCache()
+        proxy_cache.max_bytes = int(len(proxy_cache.render(self.image_url, 800, 'jpeg')) * 1.2)
+        small = proxy_cache.get(self.image_url, 400, 'jpeg')
+        os.utime(small, (0, 0))
+        large = proxy_cache.get(self.image_url, 800, 'jpeg')
+        self.assertFalse(small.exists())
+        self.assertTrue(large.exists())
+
+    def test_directory_is_scanned_only_over_the_limit(self):
+        proxy_cache = ImageProxyCache(max_bytes=10 ** 7)
+        proxy_cache.get(self.image_url, 400, 'jpeg')
+        with mock.patch.object(ImageProxyCache, 'entries', side_effect=AssertionError('varreu o diretório')):
+            proxy_cache.get(self.image_url, 800, 'jpeg')
+        self.assertEqual(cache.get(proxy_cache.size_key), sum(size for _, size, _ in proxy_cache.entries()))
+
+    def test_file_evicted_by_another_worker_is_regenerated(self):
+        get = ImageProxyCache.get
+
+        def get_then_evict(proxy_cache, *args):
+            path = get(proxy_cache, *args)
+            path.unlink()  # outro worker liberou espaço antes do open()
+            return path
+
+        with mock.patch.object(ImageProxyCache, 'get', get_then_evict):
+            response = self.get(w=400)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Image.open(io.BytesIO(response.content_bytes)).size, (400, 225))
+
+    def test_cards_use_the_proxy(self):
+        response = self.client.get(reverse('activity_list'))
+        self.assertContains(response, reverse('activity_image_proxy', args=[self.activity.pk]) + '?w=400')
+        self.assertNotContains(response, self.image_url)
+
+
+class FragmentRenderingTests(ActivityTestCase):
+    """Com ?partial=1, lista e busca devolvem só o fragmento dos resultados"""
+
+    def setUp(self):
+        super().setUp()
+        create_activities(15, tags_per_activity=1)
+
+    def test_list_fragment(self):
+        page = self.client.get(reverse('activity_list'), {'type': 'COURSE'})
+        fragment = self.client.get(reverse('activity_list'), {'type': 'COURSE', 'partial': 1})
+        self.assertContains(page, 'id="activity-results"')
+        self.assertContains(page, '<html')
+        self.assertNotContains(fragment, '<html')
+        self.assertNotContains(fragment, 'id="activity-results"')
+        self.assertContains(fragment, 'Atividade 014')
+        self.assertLess(len(fragment.content), len(page.content) - 10000)
+        # Os context processors do base.html não rodam para o fragmento
+        self.assertNotIn('font_size', fragment.context)
+
+    def test_search_fragment_links_drop_partial(self):
+        response = self.client.get(reverse('search'), {'search': 'Atividade', 'partial': 1})
+        self.assertNotContains(response, '<html')
+        self.assertContains(response, 'cursor=')
+        self.assertNotContains(response, 'partial=1')
+
+    def test_empty_fragment(self):
+        response = self.client.get(reverse('search'), {'search': 'inexistente', 'partial': 1})
+        self.assertContains(response, 'Nenhuma atividade encontrada')
+
+    def test_pages_load_live_search(self):
+        for name in ('activity_list', 'search'):
+            self.assertContains(self.client.get(reverse(name)), 'js/live_search.js')
+
+
+class ActivityCardCacheTests(ActivityTestCase):
+    """Os cards vêm do cache de fragmentos enquanto a atividade e as tags não mudam"""
+
+    def setUp(self):
+        super().setUp()
+        self.activity = create_activities(1, tags_per_activity=1)[0]
+
+    def get_list(self):
+        # Nova versão das páginas: a página é renderizada de novo, mas não os cards
+        bump_pages_version()
+        return self.client.get(reverse('activity_list'))
+
+    def test_unchanged_cards_come_from_cache(self):
+        self.assertContains(self.get_list(), 'Atividade 000')
+        Activity.objects.filter(pk=self.activity.pk).update(title='Título sem updated_at')
+        self.assertContains(self.get_list(), 'Atividade 000')
+
+        Activity.objects.filter(pk=self.activity.pk).touch()
+        self.assertContains(self.get_list(), 'Título sem updated_at')
+
+    def test_tag_changes_invalidate_cards(self):
+        self.assertContains(self.get_list(), 'tag 0')
+        ActivityTag.objects.filter(name='tag 0').update(name='renomeada')
+        self.assertContains(self.get_list(), 'tag 0')
+        bump_tags_version()
+        self.assertContains(self.get_list(), 'renomeada')
+
+    def test_layouts_are_cached_separately(self):
+        self.assertContains(self.get_list(), 'h-3 w-full bg-gradient-to-r')
+        response = self.client.get(reverse('activity_list'), {'view': 'list'})
+        self.assertContains(response, 'sm:w-2')
+        self.assertContains(self.client.get(reverse('dashboard')), 'Data de Início')
+
+
+def load_production_settings(**environ):
+    """Importa o perfil de produção de novo, com as variáveis de ambiente informadas"""
+    sys.modules.pop('ufc_activities_django.settings_production', None)
+    with mock.patch.dict(os.environ, environ):
+        return import_module('ufc_activities_django.settings_production')
+
+
+class TemplateWarmupTests(ActivityTestCase):
+    def test_production_profile_requires_secret_key(self):
+        with mock.patch.dict(os.environ), self.assertRaises(ImproperlyConfigured):
+            os.environ.pop('DJANGO_SECRET_KEY', None)
+            load_production_settings()
+        production = load_production_settings(DJANGO_SECRET_KEY='chave-de-producao')
+        self.assertEqual(production.SECRET_KEY, 'chave-de-producao')
+
+    def test_production_profile_uses_cached_loader(self):
+        production = load_production_settings(DJANGO_SECRET_KEY='chave-de-producao')
+        options = production.TEMPLATES[0]
+        self.assertFalse(options['APP_DIRS'])
+        self.assertEqual(options['OPTIONS']['loaders'][0][0], 'django.template.loaders.cached.Loader')
+        self.assertTrue(production.TEMPLATE_WARMUP)
+        # O perfil de desenvolvimento não é alterado
+        self.assertTrue(settings.TEMPLATES[0]['APP_DIRS'])
+
+    def test_warm_templates_compiles_project_templates(self):
+        names = project_template_names()
+        self.assertIn('base.html', names)
+        self.assertIn('activities/partials/activity_card.html', names)
+        self.assertNotIn('admin/base.html', names)
+        self.assertEqual(warm_templates(), len(names))
+
+    def test_benchmark_templates(self):
+        create_activities(3, tags_per_activity=1)
+        results = benchmark_templates(iterations=2, names=['activities/list.html', 'dashboard/index.html'])
+        for result in results.values():
+            self.assertGreater(result['cold_ms'], 0)
+            self.assertGreater(result['warm_ms'], 0)
+
+        out = StringIO()
+        call_command('benchmark_templates', iterations=1, templates=['base.html'], stdout=out)
+        self.assertIn('base.html', out.getvalue())
+        self.assertIn(f'Pré-compilação na subida do worker: {len(project_template_names())} templates', out.getvalue())
+
+
+class ActivityCounterTests(ActivityTestCase):
+    def counts(self):
+        return {(c.type, c.status): c.count for c in ActivityCounter.objects.filter(count__gt=0)}
+
+    def test_signals_follow_create_transition_and_delete(self):
+        activity = create_activity(type='COURSE', status='PENDING')
+        create_activity(type='COURSE', status='PENDING')
+        self.assertEqual(self.counts(), {('COURSE', 'PENDING'): 2})
+
+        activity.status = 'COMPLETED'
+        activity.save()
+        activity.save()
+        self.assertEqual(self.counts(), {('COURSE', 'PENDING'): 1, ('COURSE', 'COMPLETED'): 1})
+
+        activity.delete()
+        self.assertEqual(self.counts(), {('COURSE', 'PENDING'): 1})
+
+    def test_importer_updates_counters(self):
+        create_activity(title='Existente', type='COURSE', status='PENDING')
+        records = [
+            {'title': 'Existente', 'description': 'Descrição com mais de dez letras.', 'type': 'WORKSHOP',
+             'status': 'ACTIVE', 'start_date': date.today(), 'end_date': date.today(),
+             'location': 'Sala 1', 'coordinator': 'Prof. Ana', 'participants': 5},
+            {'title': 'Nova', 'description': 'Descrição com mais de dez letras.', 'type': 'COURSE',
+             'status': 'PENDING', 'start_date': date.today(), 'end_date': date.today(),
+             'location': 'Sala 2', 'coordinator': 'Prof. Ana', 'participants': 5},
+        ]
+        ActivityImporter().run(records)
+        self.assertEqual(self.counts(), {('WORKSHOP', 'ACTIVE'): 1, ('COURSE', 'PENDING'): 1})
+        self.assertEqual(rebuild_counters(), {})
+
+    def test_rebuild_fixes_drift(self):
+        create_activity(type='COURSE', status='PENDING')
+        # QuerySet.update não dispara signals
+        Activity.objects.update(status='CANCELLED')
+        out = StringIO()
+        call_command('rebuild_counters', stdout=out)
+        self.assertIn('COURSE/CANCELLED: 0 -> 1', out.getvalue())
+        self.assertEqual(self.counts(), {('COURSE', 'CANCELLED'): 1})
+
+    def test_list_filters_show_counts(self):
+        create_activity(type='COURSE', status='PENDING')
+        create_activity(type='WORKSHOP', status='IN_PROGRESS')
+        response = self.client.get(reverse('activity_list'))
+        self.assertContains(response, 'Curso (1)')
+        self.assertContains(response, 'Em Andamento (1)')
+        self.assertContains(response, 'Cancelada (0)')
+        # Todas as opções vêm de Activity.ACTIVITY_TYPES, inclusive OTHER
+        self.assertContains(response, 'Outro (0)')
+
+
+class FacetTests(ActivityTestCase):
+    def setUp(self):
+        super().setUp()
+        python, web = ActivityTag.objects.resolve(['python', 'web'])
+        create_activity(type='COURSE', start_date=date(2025, 3, 10)).tags.set([python, web])
+        create_activity(type='COURSE', start_date=date(2025, 4, 2)).tags.set([python])
+        create_activity(type='WORKSHOP', status='COMPLETED', start_date=date(2025, 3, 20)).tags.set([web])
+
+    def test_tag_and_month_filters(self):
+        response = self.client.get(reverse('activity_list'), {'tag': ' Python ', 'month': '2025-03'})
+        self.assertEqual(response.context['paginator'].count, 1)
+        create_activity(start_date=date(2025, 12, 31))
+        response = self.client.get(reverse('activity_list'), {'month': '2025-12'})
+        self.assertEqual(response.context['paginator'].count, 1)
+
+    def test_invalid_months_are_ignored(self):
+        for value in ('0-01', '99999-01', '9999-12', '2025-13', '2025', 'março'):
+            self.assertIsNone(parse_month(value), value)
+            for url in (reverse('activity_list'), reverse('search'), reverse('api_activity_list')):
+                response = self.client.get(url, {'month': value})
+                self.assertEqual(response.status_code, 200, (url, value))
+        self.assertEqual(parse_month('9998-12'), (9998, 12))
+
+    def test_facets_are_disjunctive(self):
+        facets = get_facets({'type': 'COURSE', 'tag': 'python'})
+        # Cada faceta ignora o próprio filtro
+        self.assertEqual(facets['type'], {'COURSE': 2})
+        self.assertEqual(facets['tag'], {'python': 2, 'web': 1})
+        self.assertEqual(facets['month'], {date(2025, 3, 1): 1, date(2025, 4, 1): 1})
+        self.assertEqual(facets['status']['UPCOMING'], 2)
+        self.assertEqual(facets['status']['COMPLETED'], 0)
+
+    def test_refining_reuses_cached_facets(self):
+        with self.assertNumQueries(2):
+            # contadores (tipo e status sem filtros) e uma consulta para tag e mês
+            get_facets({})
+        with self.assertNumQueries(1):
+            # só o filtro de tag mudou: a faceta de tags vem do cache
+            facets = get_facets({'tag': 'web'})
+        self.assertEqual(facets['type'], {'COURSE': 1, 'WORKSHOP': 1})
+        with self.assertNumQueries(0):
+            get_facets({'tag': '  WEB'})
+
+    def test_facets_follow_changes(self):
+        get_facets({'type': 'COURSE'})
+        create_activity(type='COURSE', start_date=date(2025, 5, 1))
+        self.assertEqual(len(get_facets({'type': 'COURSE'})['month']), 3)
+
+    def test_fragment_refreshes_facets(self):
+        response = self.client.get(reverse('search'), {'type': 'WORKSHOP', 'partial': '1'})
+        self.assertContains(response, 'web (1)')
+        self.assertContains(response, '?type=WORKSHOP&amp;tag=web')
+        self.assertNotContains(response, 'partial=1')
+
+    def test_fragment_carries_select_counts(self):
+        # Os selects ficam fora do fragmento; a busca ao vivo lê as contagens daqui
+        for url in (reverse('activity_list'), reverse('search')):
+            response = self.client.get(url, {'tag': 'web', 'partial': '1'})
+            self.assertContains(response, '<script id="facet-counts-type" type="application/json">')
+            self.assertContains(response, '{"COURSE": 1, "WORKSHOP": 1}')
+            self.assertContains(response, '"COMPLETED": 1')
+
+
+ASYNC_URLCONF = ModuleType('async_urls')
+ASYNC_URLCONF.urlpatterns = [
+    path('admin/', admin.site.urls),
+    path('', include(build_urlpatterns(use_async=True))),
+]
+
+
+@override_settings(ROOT_URLCONF=ASYNC_URLCONF)
+class AsyncViewsTests(ActivityTestCase):
+    """As views assíncronas devolvem as mesmas páginas que as síncronas"""
+
+    def setUp(self):
+        super().setUp()
+        self.activities = create_activities(15, tags_per_activity=2)
+
+    def test_views_are_async(self):
+        for name in ('dashboard', 'search', 'activity_list', 'activity_detail'):
+            pattern = next(p for p in build_urlpatterns(use_async=True) if p.name == name)
+            self.assertTrue(asyncio.iscoroutinefunction(pattern.callback), name)
+
+    async def test_dashboard_and_search(self):
+        response = await self.async_client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['total_activities'], 15)
+        self.assertIn('Server-Timing', response)
+
+        response = await self.async_client.get(reverse('search'), {'search': 'Atividade'})
+        self.assertEqual(len(response.context['activities']), min(15, SEARCH_PAGE_SIZE))
+        self.assertContains(response, 'Atividade 014')
+
+    async def test_list_paginates_and_supports_conditional_get(self):
+        fragment = await self.async_client.get(reverse('activity_list'), {'partial': 1})
+        self.assertNotContains(fragment, '<html')
+        self.assertContains(fragment, 'Atividade 014')
+
+        response = await self.async_client.get(reverse('activity_list'), {'page': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['paginator'].count, 15)
+        self.assertEqual(len(response.context['activities']), 3)
+        self.assertTrue(response.context['is_paginated'])
+
+        again = await self.async_client.get(
+            reverse('activity_list'), {'page': 2}, headers={'if-none-match': response['ETag']},
+        )
+        self.assertEqual(again.status_code, 304)
+
+        # Mesmo comportamento do ListView para páginas inválidas
+        for page in ('abc', 99):
+            response = await self.async_client.get(reverse('activity_list'), {'page': page})
+            self.assertEqual(response.status_code, 404, page)
+        response = await self.async_client.get(reverse('activity_list'), {'page': 'last'})
+        self.assertEqual(len(response.context['activities']), 3)
+
+    async def test_exports_stream_asynchronously(self):
+        for url, params in (
+            (reverse('activity_export'), {'format': 'csv'}),
+            (reverse('api_activity_list'), {'format': 'ndjson', 'fields': 'id,title'}),
+        ):
+            response = await self.async_client.get(url, params)
+            # Iterador assíncrono: o ASGIHandler envia os blocos sem juntá-los antes
+            self.assertTrue(response.is_async, url)
+            content = b''.join([chunk async for chunk in response.streaming_content])
+            self.assertIn(b'Atividade 014', content)
+
+    async def test_detail(self):
+        activity = self.activities[0]
+        response = await self.async_client.get(reverse('activity_detail', args=[activity.pk]))
+        self.assertContains(response, activity.title)
+        self.assertContains(response, 'tag 1')
+        missing = await self.async_client.get(reverse('activity_detail', args=[99999]))
+        self.assertEqual(missing.status_code, 404)
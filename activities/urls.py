@@ -1,17 +1,39 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import api, async_views, views
 
-urlpatterns = [
-    # Página inicial é o dashboard
-    path('', views.dashboard_view, name='dashboard'),
-    # Página de busca
-    path('search/', views.search_view, name='search'),
-    # Lista de atividades
-    path('atividades/', views.ActivityListView.as_view(), name='activity_list'),
-    path('atividades/', views.ActivityListView.as_view(), name='atividades'),
-    path('atividades/<int:pk>/', views.ActivityDetailView.as_view(), name='activity_detail'),
-    path('atividades/new/', views.ActivityCreateView.as_view(), name='activity_create'),
-    path('atividades/edit/<int:pk>/', views.ActivityUpdateView.as_view(), name='activity_update'),
-    path('atividades/delete/<int:pk>/', views.ActivityDeleteView.as_view(), name='activity_delete'),
-]
 
+def build_urlpatterns(use_async=False):
+    """Rotas do app; com use_async, as páginas públicas de leitura usam as views de async_views"""
+    if use_async:
+        dashboard = async_views.dashboard_view
+        search = async_views.search_view
+        activity_list = async_views.activity_list_view
+        activity_detail = async_views.activity_detail_view
+    else:
+        dashboard = views.dashboard_view
+        search = views.search_view
+        activity_list = views.ActivityListView.as_view()
+        activity_detail = views.ActivityDetailView.as_view()
+
+    return [
+        # Página inicial é o dashboard
+        path('', dashboard, name='dashboard'),
+        # Página de busca
+        path('search/', search, name='search'),
+        # Lista de atividades
+        path('atividades/', activity_list, name='activity_list'),
+        path('atividades/', activity_list, name='atividades'),
+        path('atividades/exportar/', views.activity_export_view, name='activity_export'),
+        path('atividades/<int:pk>/', activity_detail, name='activity_detail'),
+        path('atividades/<int:pk>/imagem/', views.activity_image_proxy_view, name='activity_image_proxy'),
+        path('atividades/new/', views.ActivityCreateView.as_view(), name='activity_create'),
+        path('atividades/edit/<int:pk>/', views.ActivityUpdateView.as_view(), name='activity_update'),
+        path('atividades/delete/<int:pk>/', views.ActivityDeleteView.as_view(), name='activity_delete'),
+        # API JSON (somente leitura)
+        path('api/atividades/', api.api_activity_list, name='api_activity_list'),
+        path('api/atividades/<int:pk>/', api.api_activity_detail, name='api_activity_detail'),
+    ]
+
+
+urlpatterns = build_urlpatterns(use_async=getattr(settings, 'ASYNC_VIEWS', False))
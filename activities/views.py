@@ -1,15 +1,83 @@
-from django.shortcuts import render, get_object_or_404, redirect
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.contrib import messages
-from django.http import JsonResponse
+from django.utils import timezone
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.decorators import method_decorator
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseBadRequest, StreamingHttpResponse,
+)
+from django.template.response import SimpleTemplateResponse, TemplateResponse
 
 from django.urls import reverse_lazy
-from django.db.models import Q, Count
-from django.core.paginator import Paginator
-from .models import Activity, ActivityTag
+from django.db.models import Count, Max
+from .models import Activity
+from .cache import cache_public_page, conditional_page, get_pages_version
+from .exports import export_rows, stream_csv, stream_xlsx, streaming_content
+from .facets import get_facets
+from .filters import filter_activities
 from .forms import ActivityForm, ActivitySearchForm
+from .pagination import KeysetPaginator, RankedKeysetPaginator
+from .proxy import PROXY_FORMATS, PROXY_WIDTHS, FetchError, ImageProxyCache, url_version
+from .stats import get_dashboard_stats
 
+SEARCH_PAGE_SIZE = 12
 
+
+def is_fragment_request(request):
+    return request.GET.get('partial') == '1'
+
+
+def page_or_fragment(request, template_name, fragment_name, context):
+    """
+    A página inteira ou, com ?partial=1 (busca ao vivo), só o fragmento dos
+    resultados. O fragmento é renderizado sem a requisição no contexto do
+    template, então os context processors do base.html não rodam.
+    """
+    if is_fragment_request(request):
+        return SimpleTemplateResponse(fragment_name, {**context, 'request': request})
+    return TemplateResponse(request, template_name, context)
+
+
+def facet_context(facets):
+    """Contagens das facetas e, por conveniência, as dos selects de tipo e status"""
+    return {'facets': facets, 'type_counts': facets['type'], 'status_counts': facets['status']}
+
+
+def activity_list_queryset(params):
+    """Atividades da página de listagem: filtros da querystring e ordenação por relevância"""
+    queryset = filter_activities(Activity.objects.with_tags(), params, ranked=True)
+    if params.get('search'):
+        return queryset.order_by('-search_rank', '-created_at')
+    return queryset.order_by('-created_at')
+
+
+def search_paginator(params):
+    """Paginador da busca: por relevância quando há termo, senão do mais recente para o mais antigo"""
+    queryset = filter_activities(Activity.objects.with_tags(), params, ranked=True)
+    if params.get('search'):
+        return RankedKeysetPaginator(queryset, per_page=SEARCH_PAGE_SIZE)
+    return KeysetPaginator(queryset, per_page=SEARCH_PAGE_SIZE)
+
+
+def activity_list_validators(request):
+    """
+    Última modificação e quantidade de atividades que casam com os filtros. As
+    facetas contam também atividades fora do resultado, então a versão das
+    páginas entra no fingerprint.
+    """
+    stats = filter_activities(Activity.objects.all(), request.GET).aggregate(
+        last_modified=Max('updated_at'), count=Count('pk'),
+    )
+    return stats['last_modified'], (stats['count'], get_pages_version())
+
+
+def activity_detail_validators(request, pk):
+    last_modified = Activity.objects.filter(pk=pk).values_list('updated_at', flat=True).first()
+    return last_modified, last_modified
+
+
+@method_decorator(conditional_page(activity_list_validators), name='dispatch')
+@method_decorator(cache_public_page, name='dispatch')
 class ActivityListView(ListView):
     model = Activity
     template_name = 'activities/list.html'
@@ -17,48 +85,24 @@ class ActivityListView(ListView):
     paginate_by = 12
     
     def get_queryset(self):
-        queryset = Activity.objects.all()
-        
-        search = self.request.GET.get('search')
-        if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(description__icontains=search) |
-                Q(coordinator__icontains=search) |
-                Q(location__icontains=search)
-            )
-        
-        activity_type = self.request.GET.get('type')
-        if activity_type:
-            queryset = queryset.filter(type=activity_type)
-            
-        status = self.request.GET.get('status')
-        if status:
-            if status == 'UPCOMING':
-                queryset = queryset.filter(status__in=['PENDING', 'UPCOMING'])
-            elif status == 'ACTIVE':
-                queryset = queryset.filter(status__in=['IN_PROGRESS', 'ACTIVE'])
-            else:
-                queryset = queryset.filter(status=status)
-        
-        start_date = self.request.GET.get('start_date')
-        if start_date:
-            queryset = queryset.filter(start_date__gte=start_date)
-        
-        end_date = self.request.GET.get('end_date')
-        if end_date:
-            queryset = queryset.filter(start_date__lte=end_date)
-            
-        return queryset.order_by('-created_at')
+        return activity_list_queryset(self.request.GET)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['search_form'] = ActivitySearchForm(self.request.GET)
         context['activity_types'] = Activity.ACTIVITY_TYPES
         context['status_choices'] = Activity.STATUS_CHOICES
+        context.update(facet_context(get_facets(self.request.GET)))
         return context
 
+    def render_to_response(self, context, **response_kwargs):
+        return page_or_fragment(
+            self.request, self.get_template_names(), 'activities/partials/activity_results.html', context,
+        )
+
 
+@method_decorator(conditional_page(activity_detail_validators), name='dispatch')
+@method_decorator(cache_public_page, name='dispatch')
 class ActivityDetailView(DetailView):
     model = Activity
     template_name = 'activities/detail.html'
@@ -105,53 +149,69 @@ class ActivityDeleteView(DeleteView):
         return super().post(request, *args, **kwargs)
 
 
+@cache_public_page
 def dashboard_view(request):
     """View para o dashboard com estatísticas"""
-    context = {
-        'total_activities': Activity.objects.count(),
-        'active_activities': Activity.objects.filter(status__in=['IN_PROGRESS', 'ACTIVE']).count(),
-        'upcoming_activities': Activity.objects.filter(status__in=['PENDING', 'UPCOMING']).count(),
-        'completed_activities': Activity.objects.filter(status='COMPLETED').count(),
-        'recent_activities': Activity.objects.order_by('-created_at')[:5],
-        'activities_by_type': Activity.objects.values('type').annotate(count=Count('type')),
-    }
-    return render(request, 'dashboard/index.html', context)
+    return TemplateResponse(request, 'dashboard/index.html', get_dashboard_stats())
 
 
 def search_view(request):
     """View para a página de busca"""
-    queryset = Activity.objects.all()
-    
-    search = request.GET.get('search')
-    if search:
-        queryset = queryset.filter(
-            Q(title__icontains=search) |
-            Q(description__icontains=search) |
-            Q(coordinator__icontains=search) |
-            Q(location__icontains=search)
-        )
-    
-    activity_type = request.GET.get('type')
-    if activity_type:
-        queryset = queryset.filter(type=activity_type)
-        
-    status = request.GET.get('status')
-    if status:
-        if status == 'UPCOMING':
-            queryset = queryset.filter(status__in=['PENDING', 'UPCOMING'])
-        elif status == 'ACTIVE':
-            queryset = queryset.filter(status__in=['IN_PROGRESS', 'ACTIVE'])
-        else:
-            queryset = queryset.filter(status=status)
-        
-    queryset = queryset.order_by('-created_at')
-    
+    page = search_paginator(request.GET).get_page(request.GET.get('cursor'))
+
     context = {
-        'activities': queryset,
+        'activities': page.object_list,
+        'page': page,
         'activity_types': Activity.ACTIVITY_TYPES,
         'status_choices': Activity.STATUS_CHOICES,
+        **facet_context(get_facets(request.GET)),
     }
-    return render(request, 'activities/search.html', context)
-
-
-
+    return page_or_fragment(request, 'activities/search.html', 'activities/partials/search_results.html', context)
+
+
+EXPORT_FORMATS = {
+    'csv': (stream_csv, 'text/csv; charset=utf-8'),
+    'xlsx': (stream_xlsx, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
+
+
+def activity_export_view(request):
+    """Exporta as atividades filtradas (mesmos filtros da listagem) em CSV ou XLSX"""
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        raise Http404('Formato de exportação não suportado')
+    stream, content_type = EXPORT_FORMATS[export_format]
+
+    rows = export_rows(activity_list_queryset(request.GET))
+    response = StreamingHttpResponse(streaming_content(request, stream(rows)), content_type=content_type)
+    filename = f'atividades-{timezone.localdate():%Y-%m-%d}.{export_format}'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def activity_image_proxy_view(request, pk):
+    """Serve a imagem externa (image_url) da atividade, redimensionada e em cache no disco"""
+    image_url = Activity.objects.filter(pk=pk).values_list('image_url', flat=True).first()
+    if not image_url:
+        raise Http404('Atividade sem imagem externa')
+    try:
+        width = int(request.GET.get('w', PROXY_WIDTHS[0]))
+    except ValueError:
+        width = None
+    if width not in PROXY_WIDTHS:
+        return HttpResponseBadRequest('Largura não suportada')
+
+    image_format = 'webp' if 'image/webp' in request.headers.get('Accept', '') else 'jpeg'
+    try:
+        image = ImageProxyCache().open(image_url, width, image_format)
+    except FetchError:
+        return HttpResponse('Não foi possível obter a imagem', status=502)
+
+    response = FileResponse(image, content_type=PROXY_FORMATS[image_format][1])
+    if request.GET.get('v') == url_version(image_url):
+        # A URL muda junto com image_url (parâmetro v), então pode ficar em cache indefinidamente
+        patch_cache_control(response, public=True, max_age=365 * 24 * 60 * 60, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=300)
+    patch_vary_headers(response, ('Accept',))
+    return response
@@ -0,0 +1,95 @@
+/*
+ * Busca ao vivo: formulários com data-live-search="<id>" atualizam só o bloco
+ * de resultados com esse id, pedindo ao servidor o fragmento (?partial=1) em
+ * vez da página inteira. A digitação espera uma pausa (debounce) e cada nova
+ * busca cancela a anterior, para que uma resposta atrasada não sobrescreva a
+ * mais recente. O fragmento traz também as contagens das facetas de tipo e
+ * status (json_script), usadas para atualizar as opções dos selects, que ficam
+ * fora do bloco substituído. Sem JavaScript, o formulário continua funcionando
+ * normalmente.
+ */
+(function () {
+    var DEBOUNCE_MS = 300;
+
+    function setup(form) {
+        var results = document.getElementById(form.dataset.liveSearch);
+        if (!results || !window.fetch || !window.AbortController) {
+            return;
+        }
+        var timer = null;
+        var controller = null;
+
+        function queryString() {
+            var params = new URLSearchParams(new FormData(form));
+            // Apagar durante o forEach pularia o parâmetro seguinte
+            var empty = [];
+            params.forEach(function (value, key) {
+                if (!value) {
+                    empty.push(key);
+                }
+            });
+            empty.forEach(function (key) {
+                params.delete(key);
+            });
+            return params.toString();
+        }
+
+        function updateCounts() {
+            ['type', 'status'].forEach(function (name) {
+                var data = results.querySelector('#facet-counts-' + name);
+                var select = form.elements[name];
+                if (!data || !select) {
+                    return;
+                }
+                var counts = JSON.parse(data.textContent);
+                Array.prototype.forEach.call(select.options, function (option) {
+                    if (option.value && option.dataset.label) {
+                        option.textContent = option.dataset.label + ' (' + (counts[option.value] || 0) + ')';
+                    }
+                });
+            });
+        }
+
+        function update() {
+            clearTimeout(timer);
+            if (controller) {
+                controller.abort();
+            }
+            controller = new AbortController();
+            var query = queryString();
+            var url = form.action.split('?')[0];
+            results.setAttribute('aria-busy', 'true');
+
+            fetch(url + '?' + (query ? query + '&' : '') + 'partial=1', {signal: controller.signal})
+                .then(function (response) {
+                    if (!response.ok) {
+                        throw new Error(response.status);
+                    }
+                    return response.text();
+                })
+                .then(function (html) {
+                    results.innerHTML = html;
+                    updateCounts();
+                    results.removeAttribute('aria-busy');
+                    history.replaceState(null, '', url + (query ? '?' + query : ''));
+                })
+                .catch(function (error) {
+                    if (error.name !== 'AbortError') {
+                        // Se o fragmento falhar, cai para a navegação normal
+                        form.submit();
+                    }
+                });
+        }
+
+        form.addEventListener('input', function (event) {
+            clearTimeout(timer);
+            timer = setTimeout(update, event.target.tagName === 'SELECT' ? 0 : DEBOUNCE_MS);
+        });
+        form.addEventListener('submit', function (event) {
+            event.preventDefault();
+            update();
+        });
+    }
+
+    document.querySelectorAll('form[data-live-search]').forEach(setup);
+})();
@@ -9,8 +9,15 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ufc_activities_django.settings')
 
 application = get_asgi_application()
+
+# Perfil de produção: compila os templates antes da primeira requisição
+if getattr(settings, 'TEMPLATE_WARMUP', False):
+    from activities.templating import warm_templates
+
+    warm_templates()
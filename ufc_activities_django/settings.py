@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -50,6 +51,9 @@ INTERNAL_IPS = [
 ]
 
 MIDDLEWARE = [
+    # Primeiro da lista para medir a requisição inteira (consultas de sessão inclusive)
+    'activities.middleware.InstrumentationMiddleware',
+    'activities.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -63,6 +67,11 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'ufc_activities_django.urls'
 
+# Views assíncronas para dashboard, busca, lista e detalhe (servir com ASGI,
+# ex.: uvicorn ufc_activities_django.asgi:application). Em WSGI continue com as
+# views síncronas: cada view assíncrona rodaria num event loop próprio.
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', '') == '1'
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -90,9 +99,50 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # WAL: leitores não esperam pelo escritor (e vice-versa);
+            # synchronous=NORMAL é seguro com WAL e evita um fsync por commit;
+            # mmap_size lê as páginas do banco direto da memória mapeada (256 MiB)
+            'init_command': (
+                'PRAGMA journal_mode=WAL;'
+                'PRAGMA synchronous=NORMAL;'
+                'PRAGMA mmap_size=268435456;'
+                'PRAGMA journal_size_limit=67108864'
+            ),
+            # Espera até 20s pelo lock de escrita em vez de falhar com "database is locked"
+            'timeout': 20,
+            # Transações pedem o lock de escrita já no BEGIN: sem isso, uma transação
+            # que começa lendo e depois escreve falha na hora, ignorando o timeout
+            'transaction_mode': 'IMMEDIATE',
+        },
+        # Reaproveita a conexão entre requisições (os PRAGMAs rodam uma vez por conexão).
+        # Em ASGI (ASYNC_VIEWS) fica desligado, como recomenda a documentação do
+        # Django: cada requisição pode deixar aberta uma conexão presa a uma thread
+        'CONN_MAX_AGE': 0 if ASYNC_VIEWS else 600,
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Réplicas de leitura (opcional): DATABASE_REPLICAS=/srv/replica1.sqlite3,/srv/replica2.sqlite3
+# A replicação em si fica por conta da infraestrutura (ex.: Litestream/LiteFS)
+for number, path in enumerate(filter(None, os.environ.get('DATABASE_REPLICAS', '').split(',')), start=1):
+    DATABASES[f'replica{number}'] = {**DATABASES['default'], 'NAME': path, 'TEST': {'MIRROR': 'default'}}
+REPLICA_DATABASES = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['activities.routers.PrimaryReplicaRouter']
+
+# Views (nome da URL) cujas leituras em GET podem ir para uma réplica
+REPLICA_READ_VIEWS = [
+    'dashboard',
+    'search',
+    'activity_list',
+    'atividades',
+    'activity_detail',
+    'activity_image_proxy',
+    'admin:activities_activity_changelist',
+]
+# Depois de gravar, o visitante lê do banco principal por este tempo (segundos)
+REPLICA_PIN_SECONDS = 10
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -127,7 +177,6 @@ USE_TZ = True
 
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
-import os
 
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
@@ -147,9 +196,96 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Threads que geram as variações redimensionadas das imagens enviadas
+# (0 gera na própria requisição, depois do commit)
+IMAGE_WORKERS = 2
+
+# Proxy das imagens externas (image_url): cache em MEDIA_ROOT/proxy
+IMAGE_PROXY_FETCHER = 'activities.proxy.UrllibFetcher'
+IMAGE_PROXY_CACHE_MAX_BYTES = 200 * 1024 * 1024
+IMAGE_PROXY_MAX_SOURCE_BYTES = 10 * 1024 * 1024
+IMAGE_PROXY_TIMEOUT = 5
+# Só para testes/desenvolvimento: permite baixar de localhost e redes privadas
+IMAGE_PROXY_ALLOW_PRIVATE_HOSTS = False
+
 # Templates directories
 TEMPLATES[0]['DIRS'] = [BASE_DIR / 'templates']
 
+# Cache
+# CACHE_BACKEND escolhe o backend por ambiente:
+#   locmem (padrão) - memória do processo; bom para desenvolvimento e testes
+#   file            - diretório compartilhado entre os workers do gunicorn
+#   redis           - servidor Redis (ou compatível) em CACHE_LOCATION; requer o pacote redis
+# Com vários workers use file ou redis: a versão das páginas em cache e as
+# sessões precisam ser vistas por todos os processos.
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'locmem')
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'ufc-activities',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('CACHE_LOCATION', BASE_DIR / 'cache'),
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'redis://127.0.0.1:6379/1'),
+    },
+}
+CACHES = {
+    'default': CACHE_BACKENDS[CACHE_BACKEND],
+}
+
+# Sessões lidas do cache e gravadas também no banco (persistem se o cache for
+# limpo). Só com um cache compartilhado: no locmem cada worker teria a sua cópia
+# da sessão (um logout em um worker não valeria nos outros) e as sessões
+# disputariam as 300 entradas do locmem com as páginas, facetas e cards.
+SESSION_ENGINE = (
+    'django.contrib.sessions.backends.cached_db' if CACHE_BACKEND in ('file', 'redis')
+    else 'django.contrib.sessions.backends.db'
+)
+
+# Tempo máximo (segundos) das estatísticas do dashboard em cache;
+# o cache também é invalidado sempre que uma atividade é salva ou excluída
+DASHBOARD_STATS_CACHE_TIMEOUT = 300
+
+# Tempo máximo (segundos) das páginas públicas em cache; edições em atividades,
+# tags e requisitos mudam a versão das chaves e aparecem imediatamente
+PAGE_CACHE_TIMEOUT = 600
+
+# Máximo de consultas ao banco por requisição, pelo nome da URL. Acima disso o
+# InstrumentationMiddleware registra um aviso ('log') ou levanta
+# QueryBudgetExceeded ('raise', usado nos testes)
+QUERY_BUDGETS = {
+    # Páginas: +2 consultas (sessão e usuário) quando o visitante está logado
+    'dashboard': 4,
+    'search': 4,
+    'activity_list': 6,
+    'atividades': 6,
+    'activity_detail': 7,
+    'activity_export': 2,
+    'activity_image_proxy': 1,
+    'api_activity_list': 3,
+    'api_activity_detail': 3,
+}
+QUERY_BUDGET_ACTION = 'log'
+
+# Uma linha JSON por requisição (InstrumentationMiddleware) com nível INFO
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'activities': {
+            'handlers': ['console'],
+            'level': os.environ.get('ACTIVITIES_LOG_LEVEL', 'WARNING'),
+        },
+    },
+}
+
 # Login URLs
 LOGIN_URL = '/accounts/login/'
 LOGIN_REDIRECT_URL = '/'
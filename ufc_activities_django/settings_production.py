@@ -0,0 +1,42 @@
+"""
+Perfil de produção: DJANGO_SETTINGS_MODULE=ufc_activities_django.settings_production
+
+Parte das configurações de desenvolvimento (settings.py) e muda o que depende
+do ambiente: DEBUG desligado, chave secreta e hosts vindos do ambiente, e os
+templates com o loader em cache explícito, compilados na subida de cada worker.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .settings import *  # noqa: F401,F403
+from .settings import TEMPLATES
+
+DEBUG = os.environ.get('DJANGO_DEBUG', '') == '1'
+
+# Nunca cai na chave de desenvolvimento, que está no repositório
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', '')
+if not SECRET_KEY:
+    raise ImproperlyConfigured('Defina DJANGO_SECRET_KEY para usar o perfil de produção')
+ALLOWED_HOSTS = os.environ.get('DJANGO_ALLOWED_HOSTS', '*').split(',')
+
+# Loader em cache explícito: não depende de DEBUG e não recarrega os arquivos
+# do disco. APP_DIRS precisa ser False quando os loaders são informados.
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        'APP_DIRS': False,
+        'OPTIONS': {
+            **TEMPLATES[0]['OPTIONS'],
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+        },
+    },
+]
+
+# Compila todos os templates ao iniciar o worker (ver activities.templating)
+TEMPLATE_WARMUP = True
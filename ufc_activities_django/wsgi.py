@@ -9,8 +9,15 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ufc_activities_django.settings')
 
 application = get_wsgi_application()
+
+# Perfil de produção: compila os templates antes da primeira requisição
+if getattr(settings, 'TEMPLATE_WARMUP', False):
+    from activities.templating import warm_templates
+
+    warm_templates()